@@ -9,6 +9,7 @@ from typing import Callable
 
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import os
@@ -77,6 +78,9 @@ app.add_middleware(RateLimitMiddleware, requests_per_minute=100)
 # Add error handling middleware
 app.add_middleware(ErrorHandlingMiddleware)
 
+# Compress larger JSON payloads (transaction list pages)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # CORS configuration - use environment variable or sensible defaults
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "").split(",") if os.getenv("CORS_ORIGINS") else []
@@ -101,6 +105,47 @@ app.add_middleware(
 )
 
 
+def load_operator_map():
+    """Shared operator snapshot (rebuilt from the DB if the Redis copy expired)"""
+    from database.connection import SessionLocal
+    from parsers.operator_mapper import OperatorMapper
+
+    db = SessionLocal()
+    try:
+        return OperatorMapper.load_shared_cache(db)
+    finally:
+        db.close()
+
+
+async def watch_operator_map(app: FastAPI) -> None:
+    """
+    Re-pull the shared operator snapshot whenever another process publishes a change,
+    and at least once per OPERATOR_MAP_TTL_SECONDS to pick up unpublished writes
+    """
+    import asyncio
+    import redis.asyncio as aioredis
+    from parsers.operator_mapper import (
+        OPERATOR_MAP_CHANNEL, OPERATOR_MAP_KEY, OPERATOR_MAP_TTL_SECONDS, OperatorMapper, REDIS_URL,
+    )
+
+    client = aioredis.from_url(REDIS_URL)
+    try:
+        async with client.pubsub() as pubsub:
+            await pubsub.subscribe(OPERATOR_MAP_CHANNEL)
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=OPERATOR_MAP_TTL_SECONDS)
+                if message is None:
+                    app.state.operator_map = await asyncio.to_thread(load_operator_map)
+                    continue
+                raw = await client.get(OPERATOR_MAP_KEY)
+                if raw:
+                    app.state.operator_map = OperatorMapper.decode_cache(raw)
+    except Exception as e:  # noqa: BLE001
+        print(f"⚠️ Operator map watcher stopped: {e}")
+    finally:
+        await client.close()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown"""
@@ -115,6 +160,17 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✅ Database initialized")
 
+    # Operator reference snapshot for request-time mapping, shared through Redis
+    # (republished by /api/reference writes, re-pulled by watch_operator_map).
+    # Rebuilt from the DB on every start, so a restart also picks up direct table edits.
+    from parsers.operator_mapper import OperatorMapper
+    db = SessionLocal()
+    try:
+        app.state.operator_map = OperatorMapper.publish_cache(db)
+    finally:
+        db.close()
+    operator_map_watcher = asyncio.create_task(watch_operator_map(app))
+
     # Start TDLib auto-monitor in background
     manager = get_tdlib_manager()
     monitor_service = init_auto_monitor_service(manager=manager, session_factory=SessionLocal)
@@ -123,6 +179,10 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
+    operator_map_watcher.cancel()
+    # Release the OpenAI HTTP/2 connections opened on this loop
+    from parsers.gpt_parser import GPTParser
+    await GPTParser.aclose_shared()
     print("👋 Shutting down API...")
 
 
@@ -41,8 +41,13 @@ async def get_top_agent(
     now = datetime.now()
     hour_ago = now - timedelta(hours=1)
     
-    # Get transactions in last hour
-    recent_transactions = db.query(Transaction).filter(
+    # Get transactions in last hour (only the columns aggregated below)
+    recent_transactions = db.query(
+        Transaction.amount_tiyin,
+        Transaction.currency,
+        Transaction.application_mapped,
+        Transaction.operator_raw,
+    ).filter(
         Transaction.parsed_at >= hour_ago
     ).all()
     
@@ -60,8 +65,8 @@ async def get_top_agent(
             insight="No transactions in the last hour"
         )
     
-    # Calculate total volume
-    total_volume = sum(abs(float(t.amount)) for t in recent_transactions if t.currency == 'UZS')
+    # Calculate total volume (integer tiyin sums, converted to UZS once at the end)
+    total_volume_tiyin = sum(abs(t.amount_tiyin) for t in recent_transactions if t.currency == 'UZS')
     
     # Find top application by count
     app_counts = {}
@@ -71,11 +76,12 @@ async def get_top_agent(
         app = t.application_mapped or t.operator_raw or "Unknown"
         app_counts[app] = app_counts.get(app, 0) + 1
         if t.currency == 'UZS':
-            app_volumes[app] = app_volumes.get(app, 0) + abs(float(t.amount))
+            app_volumes[app] = app_volumes.get(app, 0) + abs(t.amount_tiyin)
     
     top_app = max(app_counts, key=app_counts.get)
     top_app_count = app_counts[top_app]
-    top_app_volume = app_volumes.get(top_app, 0)
+    total_volume = total_volume_tiyin / 100
+    top_app_volume = app_volumes.get(top_app, 0) / 100
     
     # Generate insight (could use GPT here for more sophisticated analysis)
     percentage = (top_app_count / transaction_count) * 100
@@ -123,7 +129,7 @@ async def get_summary(
     ).scalar()
     
     # Total volume (UZS only)
-    total_volume = db.query(func.sum(func.abs(Transaction.amount))).filter(
+    total_volume_tiyin = db.query(func.sum(func.abs(Transaction.amount_tiyin))).filter(
         Transaction.currency == 'UZS'
     ).scalar() or 0
     
@@ -138,6 +144,6 @@ async def get_summary(
         "credit_count": credit_count,
         "gpt_parsed_count": gpt_parsed,
         "gpt_usage_percentage": (gpt_parsed / total_transactions * 100) if total_transactions > 0 else 0,
-        "total_volume_uzs": f"{float(total_volume):,.2f}",
+        "total_volume_uzs": f"{total_volume_tiyin / 100:,.2f}",
         "average_confidence": round(float(avg_confidence), 3)
     }
@@ -133,6 +133,16 @@ async def get_logs(
     offset = (page - 1) * page_size
     tasks = query.order_by(desc(ReceiptProcessingTask.created_at)).offset(offset).limit(page_size).all()
     
+    # Связанные транзакции одним запросом (WHERE id IN ...), а не по одному на строку
+    txn_ids = {task.transaction_id for task in tasks if task.transaction_id}
+    txn_info = {}
+    if txn_ids:
+        txn_info = {
+            row.id: row
+            for row in db.query(Transaction.id, Transaction.operator_raw, Transaction.amount)
+            .filter(Transaction.id.in_(txn_ids))
+        }
+    
     # Формируем ответ с дополнительной информацией
     items = []
     for task in tasks:
@@ -146,7 +156,7 @@ async def get_logs(
         
         # Получаем информацию о связанной транзакции
         if task.transaction_id:
-            txn = db.query(Transaction).filter(Transaction.id == task.transaction_id).first()
+            txn = txn_info.get(task.transaction_id)
             if txn:
                 operator_raw = txn.operator_raw
                 amount = str(abs(txn.amount)) if txn.amount else None
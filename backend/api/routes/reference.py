@@ -2,7 +2,7 @@
 Operator Reference API routes
 CRUD operations for operator/seller reference dictionary
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, or_
@@ -14,11 +14,17 @@ from openpyxl.styles import Font, PatternFill
 
 from database.connection import get_db_session
 from database.models import OperatorReference
+from parsers.operator_mapper import OperatorMapper
 from api.dependencies import get_current_user
 
 router = APIRouter()
 
 
+def reload_operator_map(request: Request, db: Session) -> None:
+    """Refresh the shared operator snapshot after operator_reference changes (other processes re-pull it)."""
+    request.app.state.operator_map = OperatorMapper.publish_cache(db)
+
+
 # Pydantic schemas
 class OperatorReferenceResponse(BaseModel):
     id: int
@@ -118,6 +124,7 @@ async def get_operators(
 @router.post("/", response_model=OperatorReferenceResponse)
 async def create_operator(
     operator: OperatorReferenceCreate,
+    request: Request,
     db: Session = Depends(get_db_session),
     current_user: dict = Depends(get_current_user),
 ):
@@ -136,6 +143,7 @@ async def create_operator(
         db.add(new_operator)
         db.commit()
         db.refresh(new_operator)
+        reload_operator_map(request, db)
 
         return new_operator
     except HTTPException:
@@ -151,6 +159,7 @@ async def create_operator(
 async def update_operator(
     operator_id: int,
     operator: OperatorReferenceUpdate,
+    request: Request,
     db: Session = Depends(get_db_session),
     current_user: dict = Depends(get_current_user),
 ):
@@ -168,6 +177,7 @@ async def update_operator(
 
         db.commit()
         db.refresh(db_operator)
+        reload_operator_map(request, db)
 
         return db_operator
     except HTTPException:
@@ -182,6 +192,7 @@ async def update_operator(
 @router.delete("/{operator_id}")
 async def delete_operator(
     operator_id: int,
+    request: Request,
     db: Session = Depends(get_db_session),
     current_user: dict = Depends(get_current_user),
 ):
@@ -194,6 +205,7 @@ async def delete_operator(
 
         db.delete(db_operator)
         db.commit()
+        reload_operator_map(request, db)
 
         return {"message": "Operator deleted successfully"}
     except HTTPException:
@@ -258,6 +270,7 @@ async def export_to_excel(
 
 @router.post("/import/excel")
 async def import_from_excel(
+    request: Request,
     file: UploadFile = File(...),
     db: Session = Depends(get_db_session),
     current_user: dict = Depends(get_current_user),
@@ -330,6 +343,7 @@ async def import_from_excel(
             imported += 1
 
         db.commit()
+        reload_operator_map(request, db)
 
         return {
             "imported": imported,
@@ -351,3 +365,14 @@ async def get_applications(
     """Get list of unique application names"""
     apps = db.query(OperatorReference.application_name).distinct().order_by(OperatorReference.application_name).all()
     return [app[0] for app in apps]
+
+
+@router.post("/cache/reload")
+async def reload_operator_cache(
+    request: Request,
+    db: Session = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user),
+):
+    """Reload the in-memory operator snapshot (e.g. after direct DB edits)"""
+    reload_operator_map(request, db)
+    return {"operators": len(request.app.state.operator_map)}
@@ -586,7 +586,7 @@ async def process_message(
     task_data = _build_task_data_from_message(chat_id, message_id, message)
 
     try:
-        task_id = queue_receipt_task(task_data, force=False)
+        task_id = await asyncio.to_thread(queue_receipt_task, task_data, force=False)
     except ValueError as exc:
         # Message already processed - return info about existing transaction
         raise HTTPException(status_code=409, detail=str(exc))
@@ -640,7 +640,7 @@ async def process_batch(
                 continue
             task_data = _build_task_data_from_message(chat_id, msg_id, message)
             try:
-                task_id = queue_receipt_task(task_data, force=False)
+                task_id = await asyncio.to_thread(queue_receipt_task, task_data, force=False)
             except ValueError as exc:
                 # Already processed - skip this message
                 results.append(
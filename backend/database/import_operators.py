@@ -3,6 +3,7 @@ Import operators/sellers from text file to database
 """
 from database.connection import get_db
 from database.models import OperatorReference
+from parsers.operator_mapper import OperatorMapper
 import sys
 import os
 
@@ -65,6 +66,8 @@ def import_operators_from_file(file_path: str):
 
         # Commit all changes
         db.commit()
+        # Let the API and workers pick up the new reference right away
+        OperatorMapper.publish_cache(db)
 
         print(f"\n✅ Import completed!")
         print(f"   Imported: {imported}")
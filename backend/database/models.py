@@ -4,10 +4,10 @@ SQLAlchemy ORM Models for Uzbek Receipt Parser
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
-    BigInteger, Boolean, CheckConstraint, Column, DateTime,
-    Float, Integer, Numeric, String, Text, Index, UniqueConstraint
+    BigInteger, Boolean, CheckConstraint, Column, Computed, DateTime,
+    Float, Integer, Numeric, String, Text, Index, UniqueConstraint, text
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 import uuid
@@ -31,6 +31,10 @@ class Transaction(Base):
     # Parsed Transaction Data
     transaction_date = Column(DateTime(timezone=False), nullable=False)
     amount = Column(Numeric(18, 2), nullable=False)
+    # Sign-free amount for range filters / sorting (generated, indexable)
+    abs_amount = Column(Numeric(18, 2), Computed('abs(amount)', persisted=True))
+    # Amount in tiyin (1/100 UZS) as a 64-bit integer, so SUMs run on native ints
+    amount_tiyin = Column(BigInteger, Computed('CAST(amount * 100 AS BIGINT)', persisted=True))
     currency = Column(String(3), default='UZS', nullable=False)
     card_last_4 = Column(String(4))
     operator_raw = Column(Text)
@@ -70,15 +74,24 @@ class Transaction(Base):
             name='check_parsing_method'
         ),
         UniqueConstraint('source_chat_id', 'source_message_id', name='uq_transactions_source_msg'),
-        Index('idx_transactions_date', 'transaction_date', postgresql_using='btree'),
+        # Matches the default list ordering (transaction_date DESC, id DESC) and, as its
+        # leading column, serves plain transaction_date ranges too
+        Index('idx_transactions_date_id', transaction_date.desc(), id.desc()),
+        Index('idx_transactions_type', 'transaction_type'),
+        Index('idx_transactions_currency', 'currency'),
         Index('idx_transactions_created', 'created_at', postgresql_using='btree'),
-        Index('idx_transactions_card', 'card_last_4'),
+        # Only rows with a card are ever looked up by card (equality filter implies IS NOT NULL)
+        Index('idx_transactions_card', 'card_last_4', postgresql_where=text('card_last_4 IS NOT NULL')),
         Index('idx_transactions_app', 'application_mapped'),
         Index('idx_transactions_operator', 'operator_raw'),
-        Index('idx_transactions_amount', 'amount'),
-        Index('idx_transactions_parsing', 'parsing_method', 'parsing_confidence'),
+        Index('idx_transactions_abs_amount', 'abs_amount'),
+        # List filters use confidence thresholds with or without a parsing_method
+        Index('idx_transactions_confidence_method', 'parsing_confidence', 'parsing_method'),
         Index('idx_transactions_source', 'source_type', 'source_chat_id'),
-        Index('idx_transactions_parsed_at', 'parsed_at'),
+        # parsed_at is only range-filtered and follows insert order, so a BRIN summary suffices;
+        # created_at stays B-tree because the list endpoint can ORDER BY it
+        Index('idx_transactions_parsed_at', 'parsed_at', postgresql_using='brin',
+              postgresql_with={'pages_per_range': 32}),
     )
     
     def __repr__(self):
@@ -118,7 +131,7 @@ class Check(Base):
     created_at = Column(DateTime(timezone=False), server_default=func.now())
     updated_at = Column(DateTime(timezone=False), server_default=func.now(), onupdate=func.now())
     
-    metadata_json = Column('metadata', Text)  # JSONB in original, using Text for simplicity
+    metadata_json = Column('metadata', JSONB)
     source_chat_id = Column(Text)
     source_message_id = Column(Text)
     notify_message_id = Column(Text)
@@ -199,8 +212,8 @@ class OperatorMapping(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     __table_args__ = (
-        Index('idx_operator_mappings_pattern', 'pattern'),
-        Index('idx_operator_mappings_priority', 'priority', postgresql_using='btree'),
+        # pattern lookups use the UNIQUE constraint's index; priority ordering only ever covers active rows
+        Index('idx_operator_mappings_priority', priority.desc(), postgresql_where=text('is_active = true')),
     )
     
     def __repr__(self):
@@ -220,7 +233,8 @@ class ParsingLog(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     __table_args__ = (
-        Index('idx_parsing_logs_failures', 'created_at'),
+        # Partial, matching schema.sql: only failures are looked up by time
+        Index('idx_parsing_logs_failures', created_at.desc(), postgresql_where=text('success = false')),
     )
     
     def __repr__(self):
@@ -293,6 +307,19 @@ class AutomationTask(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+class ReceiptBatchJob(Base):
+    """Background receipt batch runs (POST /api/transactions/process-receipt-batch/jobs)."""
+    __tablename__ = 'receipt_batch_jobs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    chat_id = Column(BigInteger, nullable=False)
+    status = Column(String(20), nullable=False, default='pending')  # pending | processing | completed | failed
+    progress_json = Column(Text)
+    result_json = Column(Text)  # JSON list of ProcessReceiptBatchItem
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class AutomationSuggestion(Base):
     """AI suggestions linked to automation tasks."""
     __tablename__ = 'automation_suggestions'
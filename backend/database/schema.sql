@@ -19,6 +19,8 @@ CREATE TABLE IF NOT EXISTS transactions (
     -- Parsed Transaction Data
     transaction_date TIMESTAMPTZ NOT NULL,
     amount NUMERIC(18, 2) NOT NULL,
+    abs_amount NUMERIC(18, 2) GENERATED ALWAYS AS (abs(amount)) STORED,
+    amount_tiyin BIGINT GENERATED ALWAYS AS (CAST(amount * 100 AS BIGINT)) STORED,
     currency VARCHAR(3) DEFAULT 'UZS' NOT NULL,
     card_last_4 VARCHAR(4),
     operator_raw TEXT,
@@ -40,11 +42,16 @@ CREATE TABLE IF NOT EXISTS transactions (
 );
 
 -- Indexes for performance
-CREATE INDEX idx_transactions_date ON transactions(transaction_date DESC);
+CREATE INDEX idx_transactions_date_id ON transactions(transaction_date DESC, id DESC);
+CREATE INDEX idx_transactions_type ON transactions(transaction_type);
+CREATE INDEX idx_transactions_currency ON transactions(currency);
+CREATE INDEX idx_transactions_abs_amount ON transactions(abs_amount);
+CREATE INDEX idx_transactions_confidence_method ON transactions(parsing_confidence, parsing_method);
 CREATE INDEX idx_transactions_card ON transactions(card_last_4) WHERE card_last_4 IS NOT NULL;
 CREATE INDEX idx_transactions_app ON transactions(application_mapped) WHERE application_mapped IS NOT NULL;
 CREATE INDEX idx_transactions_source ON transactions(source_type, source_chat_id);
-CREATE INDEX idx_transactions_parsed_at ON transactions(parsed_at DESC);
+CREATE INDEX idx_transactions_chat_msg ON transactions(source_chat_id, source_message_id);
+CREATE INDEX idx_transactions_parsed_at ON transactions USING BRIN (parsed_at) WITH (pages_per_range = 32);
 CREATE INDEX idx_transactions_receiver_card ON transactions(receiver_card) WHERE receiver_card IS NOT NULL;
 CREATE INDEX idx_transactions_receiver_name ON transactions(receiver_name) WHERE receiver_name IS NOT NULL;
 
@@ -62,7 +69,6 @@ CREATE TABLE IF NOT EXISTS operator_mappings (
 );
 
 -- Index for fast lookup
-CREATE INDEX idx_operator_mappings_pattern ON operator_mappings(pattern) WHERE is_active = TRUE;
 CREATE INDEX idx_operator_mappings_priority ON operator_mappings(priority DESC) WHERE is_active = TRUE;
 
 -- Table: parsing_logs
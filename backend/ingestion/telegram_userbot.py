@@ -4,6 +4,10 @@ Listens to specific chat IDs and forwards receipts to processing
 """
 import os
 import asyncio
+import logging
+import logging.handlers
+import queue
+import re
 from telethon import TelegramClient, events
 from telethon.errors import FloodWaitError, SessionPasswordNeededError
 from dotenv import load_dotenv
@@ -11,16 +15,34 @@ import json
 from datetime import datetime
 from workers.celery_worker import queue_receipt_task
 
+# Optional faster event loop
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 API_ID = int(os.getenv("TELEGRAM_API_ID"))
 API_HASH = os.getenv("TELEGRAM_API_HASH")
 PHONE = os.getenv("USERBOT_PHONE")
 SESSION_PATH = "sessions/userbot"
 
-# Target chat IDs to monitor
-TARGET_CHATS = [int(x.strip()) for x in os.getenv("TARGET_CHAT_IDS", "915326936,856264490,7028509569").split(",")]
+# Target chat IDs to monitor (immutable, deduplicated)
+TARGET_CHATS = frozenset(int(x.strip()) for x in os.getenv("TARGET_CHAT_IDS", "915326936,856264490,7028509569").split(","))
+
+# Receipt indicators; one compiled alternation instead of a per-message list scan
+RECEIPT_KEYWORDS_RE = re.compile("|".join(map(re.escape, [
+    'UZS', 'USD', 'summa', 'karta', 'HUMOCARD', 'oplata', 'Оплата', 'Пополнение',
+])))
+
+# Receipts handed to Celery per dispatcher wake-up, and how long to wait for more
+DISPATCH_BATCH_SIZE = 50
+DISPATCH_BATCH_WAIT = 0.05
 
 
 async def resolve_peers(client: TelegramClient):
@@ -28,27 +50,65 @@ async def resolve_peers(client: TelegramClient):
     Resolve peer entities for target chats
     This is critical for MTProto to cache access_hash
     """
-    print("🔍 Resolving target chat entities...")
+    logger.info("🔍 Resolving target chat entities...")
     
     for chat_id in TARGET_CHATS:
+        try:
+            # The .session file already persists access_hash; only fetch peers it lacks
+            await client.get_input_entity(chat_id)
+            logger.info("✅ Chat ID %s loaded from session cache", chat_id)
+            continue
+        except ValueError:
+            pass
+        
         try:
             # Try to get entity (this caches the access_hash)
             entity = await client.get_entity(chat_id)
-            print(f"✅ Resolved chat ID {chat_id}: {getattr(entity, 'title', 'User')}")
+            logger.info("✅ Resolved chat ID %s: %s", chat_id, getattr(entity, 'title', 'User'))
         except Exception as e:
-            print(f"⚠️  Could not resolve chat ID {chat_id}: {e}")
-            print(f"   Make sure you have interacted with this chat before or it's accessible to your account")
+            logger.warning(
+                "⚠️  Could not resolve chat ID %s: %s. Make sure you have interacted with this chat "
+                "before or it's accessible to your account", chat_id, e
+            )
+
+
+def dispatch_batch(batch: list):
+    """Enqueue a batch of receipts (blocking: DB tracking + broker publish)"""
+    for task_data in batch:
+        try:
+            task_id = queue_receipt_task(task_data)
+            logger.info("✅ Задача отправлена в Celery (task_id=%s)", task_id)
+        except Exception as e:
+            logger.error("❌ Error dispatching receipt task: %s", e)
+
+
+async def dispatcher(queue: asyncio.Queue):
+    """
+    Drain the dispatch queue in batches and enqueue them off the event loop,
+    so bursts of receipts never stall Telethon's update handling on DB/broker round-trips
+    """
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < DISPATCH_BATCH_SIZE:
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), DISPATCH_BATCH_WAIT))
+            except asyncio.TimeoutError:
+                break
+        await asyncio.to_thread(dispatch_batch, batch)
 
 
 async def start_userbot():
     """Start MTProto userbot and monitor target chats"""
-    print("🤖 Starting Telegram Userbot (MTProto)...")
+    logger.info("🤖 Starting Telegram Userbot (MTProto)...")
     
     # Create Telethon client
     client = TelegramClient(SESSION_PATH, API_ID, API_HASH)
+    dispatch_queue: asyncio.Queue = asyncio.Queue()
     
     # Event handler for new messages in target chats
-    @client.on(events.NewMessage(chats=TARGET_CHATS))
+    # Telethon only treats list/tuple/set as "many chats" (not frozenset); it builds
+    # its own id set from this once the client starts
+    @client.on(events.NewMessage(chats=tuple(TARGET_CHATS)))
     async def incoming_handler(event):
         """Handle incoming messages from monitored chats"""
         raw_text = event.message.message
@@ -61,37 +121,29 @@ async def start_userbot():
             return
         
         # Check for receipt indicators
-        keywords = ['UZS', 'USD', 'summa', 'karta', 'HUMOCARD', 'oplata', 'Оплата', 'Пополнение']
-        if not any(keyword in raw_text for keyword in keywords):
+        if not RECEIPT_KEYWORDS_RE.search(raw_text):
             return
         
-        print(f"📨 New receipt detected from chat {chat_id} (sender: {sender_id})")
+        logger.info("📨 New receipt detected from chat %s (sender: %s)", chat_id, sender_id)
         
-        # Add to processing queue
-        try:
-            task_data = {
-                'raw_text': raw_text,
-                'source_type': 'AUTO',
-                'source_chat_id': chat_id,
-                'source_message_id': msg_id,
-                'sender_id': sender_id,
-                'timestamp': datetime.now().isoformat(),
-                'added_via': 'userbot'
-            }
-            
-            task_id = queue_receipt_task(task_data)
-            print(f"✅ Задача отправлена в Celery (task_id={task_id})")
-            
-        except Exception as e:
-            print(f"❌ Error dispatching receipt task: {e}")
+        # Add to processing queue (drained by dispatcher)
+        await dispatch_queue.put({
+            'raw_text': raw_text,
+            'source_type': 'AUTO',
+            'source_chat_id': chat_id,
+            'source_message_id': msg_id,
+            'sender_id': sender_id,
+            'timestamp': datetime.now().isoformat(),
+            'added_via': 'userbot'
+        })
     
     # Start client
     await client.start(phone=PHONE)
-    print("✅ Userbot authenticated")
+    logger.info("✅ Userbot authenticated")
     
     # Check authorization
     if not await client.is_user_authorized():
-        print("⚠️  User not authorized, requesting code...")
+        logger.warning("⚠️  User not authorized, requesting code...")
         await client.send_code_request(PHONE)
         code = input("Enter the code you received: ")
         try:
@@ -103,11 +155,29 @@ async def start_userbot():
     # Resolve target peers
     await resolve_peers(client)
     
-    print(f"✅ Monitoring {len(TARGET_CHATS)} chats: {TARGET_CHATS}")
-    print("✅ Userbot is running! Press Ctrl+C to stop.")
+    logger.info("✅ Monitoring %s chats: %s", len(TARGET_CHATS), sorted(TARGET_CHATS))
+    logger.info("✅ Userbot is running! Press Ctrl+C to stop.")
     
     # Keep alive
-    await client.run_until_disconnected()
+    dispatcher_task = asyncio.create_task(dispatcher(dispatch_queue))
+    try:
+        await client.run_until_disconnected()
+    finally:
+        dispatcher_task.cancel()
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route log records through an in-memory queue; a listener thread does the stdout
+    writes, so the event loop never blocks on a slow or piped stdout
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
 
 
 async def main():
@@ -121,23 +191,29 @@ async def main():
             break
         except FloodWaitError as e:
             wait_time = e.seconds
-            print(f"⚠️  Flood wait error. Waiting {wait_time} seconds...")
+            logger.warning("⚠️  Flood wait error. Waiting %s seconds...", wait_time)
             await asyncio.sleep(wait_time)
             retry_count += 1
         except KeyboardInterrupt:
-            print("\n👋 Userbot stopped by user")
+            logger.info("👋 Userbot stopped by user")
             break
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            logger.exception("❌ Unexpected error: %s", e)
             retry_count += 1
             if retry_count < max_retries:
                 wait_time = min(2 ** retry_count, 60)  # Exponential backoff (max 60s)
-                print(f"🔄 Retrying in {wait_time} seconds... (attempt {retry_count}/{max_retries})")
+                logger.info("🔄 Retrying in %s seconds... (attempt %s/%s)", wait_time, retry_count, max_retries)
                 await asyncio.sleep(wait_time)
             else:
-                print("❌ Max retries reached. Exiting.")
+                logger.error("❌ Max retries reached. Exiting.")
                 break
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    log_listener = setup_logging()
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
@@ -2,16 +2,86 @@
 GPT-4o parser using OpenAI (text + vision)
 Fallback parser for complex or irregular receipt formats
 """
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Union
 from datetime import datetime
 from decimal import Decimal
+import asyncio
+import hashlib
 import os
 import json
 import re
-from openai import OpenAI
+import threading
+import weakref
+import httpx
+import orjson
+import redis
+from openai import DEFAULT_TIMEOUT, AsyncOpenAI, OpenAI
 from pydantic import BaseModel, Field
 import pytz
 
+from parsers.operator_mapper import OperatorMapper
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Response cache: identical (masked) receipts and operators skip the OpenAI call.
+# Bump GPT_CACHE_VERSION whenever prompts or schemas change.
+GPT_CACHE_VERSION = 1
+GPT_CACHE_TTL = 86400
+
+# Attempts after the first for 429/408/409/5xx and connection errors; the SDK backs off
+# exponentially with jitter and honours Retry-After. 400-class errors are not retried.
+OPENAI_MAX_RETRIES = 4
+
+# Async OpenAI requests in flight per process, across every orchestrator sharing a parser
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "20"))
+
+# Masking / response-extraction patterns, compiled once at import
+# Card numbers: 12-19 digits with optional separators; phone numbers: +? with 10-15 digits
+CARD_NUMBER_RE = re.compile(r"(?:\d[ -]?){12,19}")
+PHONE_NUMBER_RE = re.compile(r"\+?\d[\d -]{9,14}")
+# Runs of number-like characters long enough to hold either. Neither pattern can match
+# across other characters, so masking inside each run equals masking the whole text,
+# while the text itself is scanned (and copied) only once.
+NUMBER_RUN_RE = re.compile(r"[+\d][\d +-]{9,}")
+NON_DIGIT_RE = re.compile(r"\D")
+DIGIT_RE = re.compile(r"\d")
+JSON_DECODER = json.JSONDecoder()
+
+# resolve_application tries a slim prompt (operator + top hints, no receipt text) first
+# and only resends the full prompt when the answer is below this confidence
+RESOLVE_SLIM_MIN_CONFIDENCE = 0.6
+RESOLVE_SLIM_HINTS = 3
+RESOLVE_SLIM_APPS = 50
+
+RESOLVE_SYSTEM_PROMPT = (
+    "You map merchant/operator strings to known applications and P2P status.\n"
+    "- P2P means person-to-person transfers, card-to-card, or wallet-to-wallet between individuals.\n"
+    "- If the operator clearly indicates transfers between people (e.g., P2P, card-to-card), set is_p2p=true.\n"
+    "- If it is a merchant/shop/service/provider, set is_p2p=false.\n"
+    "- Choose application_name from the provided known list if any matches well.\n"
+    "- If none fit, return 'Unknown'.\n"
+    "- Only invent a new application_name if the operator obviously represents a different app; otherwise prefer a known app or 'Unknown'.\n"
+    "- Keep answers concise; reasoning is optional and brief."
+)
+
+# Base64 of a JPEG starts with its FF D8 FF marker encoded as "/9j/"
+JPEG_BASE64_PREFIX = "/9j/"
+
+
+def _mask_digits(match: re.Match) -> str:
+    """Keep the last 4 digits of a long number; short digit runs are left alone."""
+    digits = NON_DIGIT_RE.sub("", match.group(0))
+    if len(digits) <= 8:
+        return match.group(0)
+    last4 = digits[-4:]
+    return f"{'*' * max(4, len(digits) - 4)}{last4}"
+
+
+def _mask_number_run(match: re.Match) -> str:
+    """Mask cards first, then phones, within one run of number-like characters."""
+    run = CARD_NUMBER_RE.sub(_mask_digits, match.group(0))
+    return PHONE_NUMBER_RE.sub(_mask_digits, run)
+
 
 class TransactionSchema(BaseModel):
     """Structured output schema for GPT parsing"""
@@ -27,6 +97,16 @@ class TransactionSchema(BaseModel):
     confidence: float = Field(description="Confidence score from 0.0 to 1.0")
 
 
+class BulkTransactionItem(TransactionSchema):
+    """One receipt of a packed multi-receipt request"""
+    receipt_number: int = Field(description="Number N of the '=== RN ===' block this item was parsed from")
+
+
+class BulkTransactionSchema(BaseModel):
+    """Structured output for several receipts parsed in one request"""
+    items: List[BulkTransactionItem]
+
+
 class ApplicationResolveSchema(BaseModel):
     """Structured output for application resolution"""
     application_name: str
@@ -38,6 +118,31 @@ class ApplicationResolveSchema(BaseModel):
 
 class GPTParser:
     """Parser using OpenAI GPT-4o with Structured Outputs and vision fallback."""
+
+    # Per-process parsers by API key (see get_shared)
+    _shared: Dict[str, "GPTParser"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls, api_key: str) -> "GPTParser":
+        """
+        Process-wide parser for api_key, so every orchestrator reuses the same OpenAI
+        clients (connection pools, TLS sessions) instead of building new ones per receipt.
+        """
+        parser = cls._shared.get(api_key)
+        if parser is None:
+            with cls._shared_lock:
+                parser = cls._shared.get(api_key)
+                if parser is None:
+                    parser = cls(api_key=api_key)
+                    cls._shared[api_key] = parser
+        return parser
+
+    @classmethod
+    async def aclose_shared(cls) -> None:
+        """Close the shared parsers' async clients for the running event loop (app shutdown)."""
+        for parser in list(cls._shared.values()):
+            await parser.aclose()
     
     def __init__(self, api_key: Optional[str] = None, timezone: str = "Asia/Tashkent", allow_without_api_key: bool = True):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -47,7 +152,13 @@ class GPTParser:
                 raise ValueError("OpenAI API key is required")
             self.client = None
         else:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = OpenAI(api_key=self.api_key, max_retries=OPENAI_MAX_RETRIES)
+        # Async client and request limit, created on first use in each event loop: both bind
+        # to the loop they first run on, and a shared parser outlives any single asyncio.run
+        # (loop -> (AsyncOpenAI, Semaphore); entries go away with their loop, but the
+        # client's sockets only close through aclose())
+        self._loop_resources = weakref.WeakKeyDictionary()
+        self.cache = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=1, socket_timeout=1) if self.enabled else None
         self.tz = pytz.timezone(timezone)
         
         self.system_prompt = """You are a financial data analyst specialized in Uzbek payment systems.
@@ -75,21 +186,10 @@ Return ONLY a JSON object matching TransactionSchema keys."""
     
     def _mask_sensitive_text(self, text: str) -> str:
         """Mask long digit sequences to avoid leaking card/phone numbers."""
-        if not text:
+        # Nothing to mask without digits; one early-exit scan skips the substitution pass
+        if not text or not DIGIT_RE.search(text):
             return text
-
-        def mask_digits(match: re.Match) -> str:
-            digits = re.sub(r"\D", "", match.group(0))
-            if len(digits) <= 8:
-                return match.group(0)
-            last4 = digits[-4:]
-            return f"{'*' * max(4, len(digits) - 4)}{last4}"
-
-        # Card numbers: 12-19 digits with optional separators
-        masked = re.sub(r"(?:\d[ -]?){12,19}", mask_digits, text)
-        # Phone numbers: +? with 10-15 digits
-        masked = re.sub(r"\+?\d[\d -]{9,14}", mask_digits, masked)
-        return masked
+        return NUMBER_RUN_RE.sub(_mask_number_run, text)
 
     def _convert_schema(self, parsed: TransactionSchema) -> Dict[str, Any]:
         transaction_date = datetime.fromisoformat(parsed.transaction_date_iso.replace('Z', '+00:00'))
@@ -112,6 +212,90 @@ Return ONLY a JSON object matching TransactionSchema keys."""
             'parsing_confidence': parsed.confidence
         }
 
+    def _build_async_client(self) -> AsyncOpenAI:
+        # HTTP/2 multiplexes parse_many's concurrent requests over a few connections
+        # instead of one TLS handshake per in-flight call
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                timeout=DEFAULT_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            ),
+        )
+
+    def _current_loop_resources(self) -> Tuple[AsyncOpenAI, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        resources = self._loop_resources.get(loop)
+        if resources is None:
+            resources = (self._build_async_client(), asyncio.Semaphore(OPENAI_MAX_CONCURRENCY))
+            self._loop_resources[loop] = resources
+        return resources
+
+    async def aclose(self) -> None:
+        """
+        Close the running loop's AsyncOpenAI client and its HTTP/2 connection pool.
+        Call before the loop ends; the next use in that loop builds a fresh client.
+        """
+        resources = self._loop_resources.pop(asyncio.get_running_loop(), None)
+        if resources is not None:
+            await resources[0].close()
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """AsyncOpenAI client for the running event loop"""
+        return self._current_loop_resources()[0]
+
+    @property
+    def request_slots(self) -> asyncio.Semaphore:
+        """Limit on in-flight async requests in the running event loop (OPENAI_MAX_CONCURRENCY)"""
+        return self._current_loop_resources()[1]
+
+    def _text_request(self, text: str) -> Dict[str, Any]:
+        masked_text = self._mask_sensitive_text(text or "")
+        return {
+            "model": "gpt-4o-2024-08-06",
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": f"Parse this Uzbek financial receipt:\n\n{masked_text}"}
+            ],
+            "response_format": TransactionSchema,
+            "temperature": 0.1,
+        }
+
+    def _cache_key(self, kind: str, model: str, payload: str) -> str:
+        digest = hashlib.blake2b(
+            f"{model}|{GPT_CACHE_VERSION}|{payload}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return f"gpt_cache:{kind}:{digest}"
+
+    def _cache_get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            print(f"⚠️ GPT cache read failed: {e}")
+            return None
+
+    def _cache_set(self, key: str, value: Union[str, bytes]) -> None:
+        try:
+            self.cache.setex(key, GPT_CACHE_TTL, value)
+        except Exception as e:
+            print(f"⚠️ GPT cache write failed: {e}")
+
+    def _parse_cache_key(self, request: Dict[str, Any]) -> str:
+        # The raw TransactionSchema is cached; conversion (tz, Decimal) reruns on a hit
+        return self._cache_key("parse", request["model"], request["messages"][-1]["content"])
+
+    def _resolve_cache_key(self, model: str, operator_raw: str, known_apps: List[str]) -> str:
+        # Same operator against the same app list resolves the same way, whatever the receipt
+        return self._cache_key(
+            "resolve",
+            model,
+            "|".join([OperatorMapper.normalize_operator(operator_raw), *sorted(known_apps)]),
+        )
+
     def parse(self, text: str) -> Optional[Dict[str, Any]]:
         """
         Parse receipt using GPT-4o with Structured Outputs.
@@ -120,50 +304,212 @@ Return ONLY a JSON object matching TransactionSchema keys."""
             print("⚠️ GPT parsing skipped: OpenAI API key not configured")
             return None
         try:
-            masked_text = self._mask_sensitive_text(text or "")
-            response = self.client.beta.chat.completions.parse(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Parse this Uzbek financial receipt:\n\n{masked_text}"}
-                ],
-                response_format=TransactionSchema,
-                temperature=0.1,
-            )
+            request = self._text_request(text)
+            cache_key = self._parse_cache_key(request)
+            cached = self._cache_get(cache_key)
+            if cached:
+                return self._convert_schema(TransactionSchema.model_validate_json(cached))
+
+            response = self.client.beta.chat.completions.parse(**request)
             parsed = response.choices[0].message.parsed
             if not parsed:
                 return None
+            self._cache_set(cache_key, parsed.model_dump_json())
             return self._convert_schema(parsed)
         except Exception as e:
             print(f"❌ GPT parsing error: {e}")
             return None
 
-    def _extract_json(self, content: Optional[str]) -> Optional[Dict[str, Any]]:
-        if not content:
+    async def aparse(self, text: str) -> Optional[Dict[str, Any]]:
+        """Async variant of parse() on the AsyncOpenAI client."""
+        if not self.enabled:
+            print("⚠️ GPT parsing skipped: OpenAI API key not configured")
             return None
         try:
-            return json.loads(content)
-        except Exception:
-            pass
-        # Try to extract JSON block from code fences
-        try:
-            match = re.search(r"\{.*\}", content, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-        except Exception:
+            request = self._text_request(text)
+            cache_key = self._parse_cache_key(request)
+            # The Redis client is blocking; keep its round trips off the event loop
+            cached = await asyncio.to_thread(self._cache_get, cache_key)
+            if cached:
+                return self._convert_schema(TransactionSchema.model_validate_json(cached))
+
+            async with self.request_slots:
+                response = await self.async_client.beta.chat.completions.parse(**request)
+            parsed = response.choices[0].message.parsed
+            if not parsed:
+                return None
+            await asyncio.to_thread(self._cache_set, cache_key, parsed.model_dump_json())
+            return self._convert_schema(parsed)
+        except Exception as e:
+            print(f"❌ GPT parsing error: {e}")
             return None
-        return None
 
-    def parse_from_images(self, images_b64: List[str], text_hint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def parse_many(self, texts: List[str], concurrency: int = 20) -> List[Optional[Dict[str, Any]]]:
+        """
+        Parse several receipts concurrently (at most `concurrency` requests in flight).
+        Results keep the order of `texts`; failed receipts come back as None.
         """
-        Vision-based parsing using GPT-4o images. Images are base64 PNG strings.
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def parse_one(text: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.aparse(text)
+
+        results = await asyncio.gather(*(parse_one(t) for t in texts), return_exceptions=True)
+        return [None if isinstance(r, BaseException) else r for r in results]
+
+    def parse_bulk(self, texts: List[str], group_size: int = 10) -> List[Optional[Dict[str, Any]]]:
         """
+        Parse several receipts with one request per `group_size` receipts, so the system
+        prompt is sent once per group instead of once per receipt. Results keep the order
+        of `texts`; receipts the model skipped or that failed come back as None.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
         if not self.enabled:
-            print("⚠️ Vision parsing skipped: OpenAI API key not configured")
-            return None
-        if not images_b64:
+            print("⚠️ GPT parsing skipped: OpenAI API key not configured")
+            return results
+
+        # Cached receipts (same keys as parse()) are answered up front; only misses are sent
+        cache_keys = [self._parse_cache_key(self._text_request(text)) for text in texts]
+        pending: List[int] = []
+        for idx, cache_key in enumerate(cache_keys):
+            cached = self._cache_get(cache_key)
+            if cached:
+                try:
+                    results[idx] = self._convert_schema(TransactionSchema.model_validate_json(cached))
+                    continue
+                except Exception as e:
+                    print(f"❌ GPT cached result error: {e}")
+            pending.append(idx)
+
+        for start in range(0, len(pending), group_size):
+            group = pending[start:start + group_size]
+            blocks = [
+                f"=== R{number} ===\n{self._mask_sensitive_text(texts[idx] or '')}"
+                for number, idx in enumerate(group, start=1)
+            ]
+            try:
+                response = self.client.beta.chat.completions.parse(
+                    model="gpt-4o-2024-08-06",
+                    messages=[
+                        {"role": "system", "content": self.system_prompt},
+                        {
+                            "role": "user",
+                            "content": (
+                                "Parse each of the following Uzbek financial receipts. Return one item per "
+                                "receipt in BulkTransactionSchema.items, with receipt_number set to N of "
+                                "its '=== RN ===' header.\n\n" + "\n\n".join(blocks)
+                            ),
+                        },
+                    ],
+                    response_format=BulkTransactionSchema,
+                    temperature=0.1,
+                )
+                parsed = response.choices[0].message.parsed
+                if not parsed:
+                    continue
+                for item in parsed.items:
+                    if 1 <= item.receipt_number <= len(group):
+                        idx = group[item.receipt_number - 1]
+                        try:
+                            results[idx] = self._convert_schema(item)
+                            self._cache_set(
+                                cache_keys[idx],
+                                TransactionSchema.model_validate(item.model_dump()).model_dump_json(),
+                            )
+                        except Exception as e:
+                            print(f"❌ GPT bulk item error (R{item.receipt_number}): {e}")
+            except Exception as e:
+                print(f"❌ GPT bulk parsing error: {e}")
+        return results
+
+    def submit_batch(self, texts: List[str]) -> str:
+        """
+        Submit receipts to the OpenAI Batch API (half the token price, separate rate
+        limits, results within 24h) for non-interactive re-parsing. Each request's
+        custom_id is "r-<index into texts>". Returns the batch id.
+        """
+        if not self.enabled:
+            raise ValueError("OpenAI API key is required for batch parsing")
+
+        lines = []
+        for idx, text in enumerate(texts):
+            request = self._text_request(text)
+            # The batch body must be plain JSON: ask for a JSON object and validate it
+            # against TransactionSchema on the way back (as the vision path does)
+            request["response_format"] = {"type": "json_object"}
+            lines.append(json.dumps({
+                "custom_id": f"r-{idx}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": request,
+            }, ensure_ascii=False))
+
+        batch_file = self.client.files.create(
+            file=("receipts.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Current state of a submitted batch; output_file_id is set once it completes."""
+        batch = self.client.batches.retrieve(batch_id)
+        return {
+            "status": batch.status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id,
+            "request_counts": batch.request_counts.model_dump() if batch.request_counts else None,
+        }
+
+    def download_results(self, output_file_id: str) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Stream a completed batch's output JSONL and convert each response like parse().
+        Maps custom_id to the parsed transaction dict, or None for failed/unparseable lines.
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        content = self.client.files.content(output_file_id)
+        for line in content.iter_lines():
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            custom_id = item.get("custom_id")
+            response = item.get("response") or {}
+            try:
+                if item.get("error") or response.get("status_code") != 200:
+                    raise ValueError(item.get("error") or f"HTTP {response.get('status_code')}")
+                message = response["body"]["choices"][0]["message"]
+                parsed_json = self._extract_json(message.get("content"))
+                if not parsed_json:
+                    raise ValueError("empty response")
+                results[custom_id] = self._convert_schema(TransactionSchema.model_validate(parsed_json))
+            except Exception as e:
+                print(f"❌ GPT batch result error ({custom_id}): {e}")
+                results[custom_id] = None
+        return results
+
+    def _extract_json(self, content: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not content:
             return None
+        try:
+            return orjson.loads(content)
+        except Exception:
+            pass
+        # Take the first complete JSON object in the text (code fences, surrounding prose);
+        # raw_decode stops at the object's end instead of matching up to the last brace
+        start = content.find("{")
+        while start != -1:
+            try:
+                return JSON_DECODER.raw_decode(content, start)[0]
+            except ValueError:
+                start = content.find("{", start + 1)
+        return None
 
+    def _vision_request(self, images_b64: List[str], text_hint: Optional[str]) -> Dict[str, Any]:
         prompt = (
             "Extract structured transaction data from these receipt images. "
             "Return ONLY a JSON object with keys: amount, currency, transaction_date_iso, "
@@ -180,31 +526,135 @@ Return ONLY a JSON object matching TransactionSchema keys."""
             )
 
         for img in images_b64:
-            user_content.append({"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img}"}})
+            mime = "image/jpeg" if img.startswith(JPEG_BASE64_PREFIX) else "image/png"
+            user_content.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{img}"}})
+
+        return {
+            "model": "gpt-4o-2024-08-06",
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            "temperature": 0.1,
+            "max_tokens": 600,
+        }
+
+    def _vision_result(self, response) -> Optional[Dict[str, Any]]:
+        raw_content = response.choices[0].message.content
+        parsed_json = self._extract_json(raw_content)
+        if not parsed_json:
+            return None
+        schema = TransactionSchema.model_validate(parsed_json)
+        result = self._convert_schema(schema)
+        # Mark vision usage explicitly
+        result["parsing_method"] = "GPT_VISION"
+        return result
+
+    def parse_from_images(self, images_b64: List[str], text_hint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Vision-based parsing using GPT-4o images. Images are base64 PNG or JPEG strings.
+        """
+        if not self.enabled:
+            print("⚠️ Vision parsing skipped: OpenAI API key not configured")
+            return None
+        if not images_b64:
+            return None
 
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-                temperature=0.1,
-                max_tokens=600,
-            )
-            raw_content = response.choices[0].message.content
-            parsed_json = self._extract_json(raw_content)
-            if not parsed_json:
-                return None
-            schema = TransactionSchema.model_validate(parsed_json)
-            result = self._convert_schema(schema)
-            # Mark vision usage explicitly
-            result["parsing_method"] = "GPT_VISION"
-            return result
+            response = self.client.chat.completions.create(**self._vision_request(images_b64, text_hint))
+            return self._vision_result(response)
         except Exception as e:
             print(f"❌ GPT vision parsing error: {e}")
             return None
 
+    async def aparse_from_images(self, images_b64: List[str], text_hint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Async variant of parse_from_images() on the AsyncOpenAI client."""
+        if not self.enabled:
+            print("⚠️ Vision parsing skipped: OpenAI API key not configured")
+            return None
+        if not images_b64:
+            return None
+
+        try:
+            async with self.request_slots:
+                response = await self.async_client.chat.completions.create(**self._vision_request(images_b64, text_hint))
+            return self._vision_result(response)
+        except Exception as e:
+            print(f"❌ GPT vision parsing error: {e}")
+            return None
+
+    def _resolve_request(
+        self,
+        operator_raw: str,
+        raw_text: str,
+        known_apps: List[str],
+        dictionary_hints: List[Dict[str, Any]],
+        slim: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Build the resolve request. The slim variant sends only the operator, the top
+        dictionary hints and a bounded app list (no receipt text); the full one adds the
+        masked receipt text and more hints for operators the slim pass is unsure about.
+        """
+        if slim:
+            known_apps = known_apps[:RESOLVE_SLIM_APPS]
+            dictionary_hints = dictionary_hints[:RESOLVE_SLIM_HINTS]
+        else:
+            dictionary_hints = dictionary_hints[:10]
+
+        hints_block = "".join(
+            "\n- " + (
+                f"{hint.get('operator_name') or hint.get('matched_operator_name') or ''} -> "
+                f"{hint.get('application_name') or 'Unknown'} (p2p={hint.get('is_p2p')})"
+            ).strip()
+            for hint in dictionary_hints
+        )
+        user_prompt = (
+            f"Operator raw: {operator_raw or ''}\n"
+            f"Known applications: {', '.join(known_apps) if known_apps else '[]'}"
+        )
+        if hints_block:
+            user_prompt += f"\nDictionary hints:{hints_block}"
+        if not slim:
+            masked_text = self._mask_sensitive_text(raw_text or "")
+            if masked_text:
+                user_prompt += f"\nReceipt text (masked):\n{masked_text[:4000]}"  # keep prompt bounded
+
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": RESOLVE_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            "response_format": ApplicationResolveSchema,
+            "temperature": 0.15,
+        }
+
+    def _resolve_result(self, response) -> Optional[Dict[str, Any]]:
+        parsed: ApplicationResolveSchema = response.choices[0].message.parsed  # type: ignore
+        if not parsed:
+            return None
+
+        app_name = (parsed.application_name or "").strip()
+        if not app_name:
+            return None
+        app_name = app_name[:200]
+
+        confidence = parsed.confidence
+        try:
+            confidence = float(confidence)
+        except Exception:
+            confidence = 0.0
+        confidence = max(0.0, min(1.0, confidence))
+
+        return {
+            "application_name": app_name,
+            "is_p2p": bool(parsed.is_p2p),
+            "confidence": confidence,
+            "recommended_operator_name": (parsed.recommended_operator_name or "").strip() or None,
+            "reasoning": (parsed.reasoning or "").strip() or None,
+        }
+
     def resolve_application(
         self,
         operator_raw: str,
@@ -220,72 +670,53 @@ Return ONLY a JSON object matching TransactionSchema keys."""
             return None
 
         try:
-            hints_formatted = []
-            for hint in dictionary_hints[:10]:
-                op_name = hint.get("operator_name") or hint.get("matched_operator_name") or ""
-                app_name = hint.get("application_name") or "Unknown"
-                p2p_val = hint.get("is_p2p")
-                hints_formatted.append(
-                    f"{op_name} -> {app_name} (p2p={p2p_val})".strip()
-                )
-
-            system_prompt = (
-                "You map merchant/operator strings to known applications and P2P status.\n"
-                "- P2P means person-to-person transfers, card-to-card, or wallet-to-wallet between individuals.\n"
-                "- If the operator clearly indicates transfers between people (e.g., P2P, card-to-card), set is_p2p=true.\n"
-                "- If it is a merchant/shop/service/provider, set is_p2p=false.\n"
-                "- Choose application_name from the provided known list if any matches well.\n"
-                "- If none fit, return 'Unknown'.\n"
-                "- Only invent a new application_name if the operator obviously represents a different app; otherwise prefer a known app or 'Unknown'.\n"
-                "- Keep answers concise; reasoning is optional and brief."
-            )
+            request = self._resolve_request(operator_raw, raw_text, known_apps, dictionary_hints, slim=True)
+            full_request = self._resolve_request(operator_raw, raw_text, known_apps, dictionary_hints)
+            cache_key = self._resolve_cache_key(request["model"], operator_raw, known_apps)
+            cached = self._cache_get(cache_key)
+            if cached:
+                return orjson.loads(cached)
 
-            user_prompt_lines = [
-                f"Operator raw: {operator_raw or ''}",
-                f"Known applications: {', '.join(known_apps) if known_apps else '[]'}",
-            ]
-            if hints_formatted:
-                user_prompt_lines.append("Dictionary hints:")
-                for h in hints_formatted:
-                    user_prompt_lines.append(f"- {h}")
-            masked_text = self._mask_sensitive_text(raw_text or "")
-            if masked_text:
-                user_prompt_lines.append("Receipt text (masked):")
-                user_prompt_lines.append(masked_text[:4000])  # keep prompt bounded
-
-            response = self.client.beta.chat.completions.parse(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": "\n".join(user_prompt_lines)},
-                ],
-                response_format=ApplicationResolveSchema,
-                temperature=0.15,
-            )
+            result = self._resolve_result(self.client.beta.chat.completions.parse(**request))
+            if not result or result["confidence"] < RESOLVE_SLIM_MIN_CONFIDENCE:
+                result = self._resolve_result(self.client.beta.chat.completions.parse(**full_request)) or result
+            # Only confident answers are reused for other receipts of the same operator
+            if result and result["confidence"] >= RESOLVE_SLIM_MIN_CONFIDENCE:
+                self._cache_set(cache_key, orjson.dumps(result, default=str))
+            return result
+        except Exception as e:
+            print(f"❌ GPT application resolve error: {e}")
+            return None
 
-            parsed: ApplicationResolveSchema = response.choices[0].message.parsed  # type: ignore
-            if not parsed:
-                return None
+    async def aresolve_application(
+        self,
+        operator_raw: str,
+        raw_text: str,
+        known_apps: List[str],
+        dictionary_hints: List[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of resolve_application() on the AsyncOpenAI client."""
+        if not self.enabled:
+            print("⚠️ Application resolve skipped: OpenAI API key not configured")
+            return None
 
-            app_name = (parsed.application_name or "").strip()
-            if not app_name:
-                return None
-            app_name = app_name[:200]
+        try:
+            request = self._resolve_request(operator_raw, raw_text, known_apps, dictionary_hints, slim=True)
+            full_request = self._resolve_request(operator_raw, raw_text, known_apps, dictionary_hints)
+            cache_key = self._resolve_cache_key(request["model"], operator_raw, known_apps)
+            cached = await asyncio.to_thread(self._cache_get, cache_key)
+            if cached:
+                return orjson.loads(cached)
 
-            confidence = parsed.confidence
-            try:
-                confidence = float(confidence)
-            except Exception:
-                confidence = 0.0
-            confidence = max(0.0, min(1.0, confidence))
-
-            result = {
-                "application_name": app_name,
-                "is_p2p": bool(parsed.is_p2p),
-                "confidence": confidence,
-                "recommended_operator_name": (parsed.recommended_operator_name or "").strip() or None,
-                "reasoning": (parsed.reasoning or "").strip() or None,
-            }
+            async with self.request_slots:
+                response = await self.async_client.beta.chat.completions.parse(**request)
+            result = self._resolve_result(response)
+            if not result or result["confidence"] < RESOLVE_SLIM_MIN_CONFIDENCE:
+                async with self.request_slots:
+                    response = await self.async_client.beta.chat.completions.parse(**full_request)
+                result = self._resolve_result(response) or result
+            if result and result["confidence"] >= RESOLVE_SLIM_MIN_CONFIDENCE:
+                await asyncio.to_thread(self._cache_set, cache_key, orjson.dumps(result, default=str))
             return result
         except Exception as e:
             print(f"❌ GPT application resolve error: {e}")
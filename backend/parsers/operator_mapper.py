@@ -2,13 +2,131 @@
 Operator name to application mapping module
 Uses operator_reference as single source of truth.
 """
-import re
+import heapq
+import os
+import string
+from bisect import bisect_right
+from collections import defaultdict
 from typing import Optional, List, Tuple, Dict
 
+import orjson
+import redis
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+# Optional Aho-Corasick automaton for the substring scan
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from database.models import OperatorReference
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Shared build_cache snapshot: loaded from the DB by one process, read by every
+# API/worker process; writers publish on the channel so subscribers re-pull it
+OPERATOR_MAP_KEY = "operator_map"
+OPERATOR_MAP_CHANNEL = "operator_map:invalidate"
+# The snapshot expires so writes that bypass publish_cache (scripts, manual SQL)
+# reach every process within this many seconds, via a rebuild from the DB
+OPERATOR_MAP_TTL_SECONDS = 300
+
+_redis_client: Optional[redis.Redis] = None
+
+
+class _AsciiAlnumTable(dict):
+    """str.translate table: A-Z, 0-9 and space map to themselves, anything else to a space."""
+
+    def __missing__(self, codepoint: int) -> str:
+        self[codepoint] = " "
+        return " "
+
+
+_NORMALIZE_TABLE = _AsciiAlnumTable((ord(c), c) for c in string.ascii_uppercase + string.digits + " ")
+
+MappingEntry = Tuple[int, str, str, bool]
+
+
+class _MatchIndex:
+    """
+    Lookup structures over one cache snapshot:
+    - exact: pattern -> first row with that pattern
+    - automaton: Aho-Corasick over the distinct patterns (optional dependency)
+    - token_index: token -> cache positions of rows whose pattern has that token
+    - joined/offsets: all patterns in one NUL-separated string, for "input in pattern"
+    """
+
+    def __init__(self, mappings_cache: List[MappingEntry]):
+        self.mappings_cache = mappings_cache
+        self.exact: Dict[str, MappingEntry] = {}
+        self.positions: Dict[str, List[int]] = defaultdict(list)
+        self.token_index: Dict[str, List[int]] = defaultdict(list)
+        patterns: List[str] = []
+        self.offsets: List[int] = []
+        self.offset_positions: List[int] = []
+
+        offset = 0
+        for position, entry in enumerate(mappings_cache):
+            pattern = entry[1]
+            if not pattern:
+                continue
+            self.exact.setdefault(pattern, entry)
+            self.positions[pattern].append(position)
+            for token in set(pattern.split()):
+                self.token_index[token].append(position)
+            patterns.append(pattern)
+            self.offsets.append(offset)
+            self.offset_positions.append(position)
+            offset += len(pattern) + 1
+        self.joined = "\0".join(patterns)
+
+        self.automaton = None
+        if AHOCORASICK_AVAILABLE and self.exact:
+            self.automaton = ahocorasick.Automaton()
+            # Value carries cache order so equal-length matches resolve like the linear scan
+            for order, (pattern, entry) in enumerate(self.exact.items()):
+                self.automaton.add_word(pattern, (order, entry))
+            self.automaton.make_automaton()
+
+    def contained_patterns(self, text: str) -> List[str]:
+        """Distinct patterns occurring in text."""
+        if self.automaton is not None:
+            return list({entry[1] for _, (_, entry) in self.automaton.iter(text)})
+        return [pattern for pattern in self.exact if pattern in text]
+
+    def positions_containing(self, text: str) -> List[int]:
+        """Cache positions of rows whose pattern contains text (a C-level find over all patterns)."""
+        found: List[int] = []
+        start = self.joined.find(text)
+        while start != -1:
+            idx = bisect_right(self.offsets, start) - 1
+            found.append(self.offset_positions[idx])
+            # Continue after this pattern; one hit per row is enough
+            next_offset = self.offsets[idx + 1] if idx + 1 < len(self.offsets) else len(self.joined)
+            start = self.joined.find(text, next_offset)
+        return found
+
+
+# Last built match index; mappers are created per receipt around the same shared
+# snapshot, so the index is built once per snapshot
+_match_index: Optional[_MatchIndex] = None
+
+
+def _get_match_index(mappings_cache: List[MappingEntry]) -> _MatchIndex:
+    global _match_index
+    if _match_index is None or _match_index.mappings_cache is not mappings_cache:
+        _match_index = _MatchIndex(mappings_cache)
+    return _match_index
+
+
+def get_redis_client() -> redis.Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+    return _redis_client
+
 
 class OperatorMapper:
     """
@@ -17,10 +135,18 @@ class OperatorMapper:
     Cache layout: (id, operator_name_normalized, application_name, is_p2p)
     """
 
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: Session,
+        mappings_cache: Optional[List[Tuple[int, str, str, bool]]] = None,
+    ):
         self.db_session = db_session
         self.mappings_cache: List[Tuple[int, str, str, bool]] = []
-        self.refresh_cache()
+        if mappings_cache is None:
+            self.refresh_cache()
+        else:
+            # Snapshot prepared by build_cache (e.g. app.state.operator_map)
+            self.mappings_cache = mappings_cache
 
     @staticmethod
     def normalize_operator(value: str) -> str:
@@ -32,29 +158,69 @@ class OperatorMapper:
         """
         if not value:
             return ""
-        normalized = value.upper()
-        normalized = re.sub(r"[\s\t\n]+", " ", normalized)
-        normalized = re.sub(r"[^A-Z0-9 ]", " ", normalized)
-        normalized = " ".join(normalized.split())
-        return normalized
+        # One C-level translate pass; split/join then collapses the resulting spaces
+        return " ".join(value.upper().translate(_NORMALIZE_TABLE).split())
+
+    @classmethod
+    def build_cache(cls, db_session: Session) -> List[Tuple[int, str, str, bool]]:
+        """Load active operator_reference rows in cache layout."""
+        # Core select of the four columns: plain row tuples, no ORM/Query layer
+        rows = db_session.execute(
+            select(
+                OperatorReference.id,
+                OperatorReference.operator_name,
+                OperatorReference.application_name,
+                OperatorReference.is_p2p,
+            ).where(OperatorReference.is_active == True)  # noqa: E712
+        ).all()
+        return [
+            (ref_id, cls.normalize_operator(operator_name), application_name, bool(is_p2p))
+            for ref_id, operator_name, application_name, is_p2p in rows
+            if operator_name and application_name
+        ]
+
+    @staticmethod
+    def decode_cache(raw: bytes) -> List[Tuple[int, str, str, bool]]:
+        """Decode a snapshot stored under OPERATOR_MAP_KEY."""
+        return [tuple(item) for item in orjson.loads(raw)]
+
+    @classmethod
+    def load_shared_cache(cls, db_session: Session) -> List[Tuple[int, str, str, bool]]:
+        """
+        Snapshot from Redis; on a miss (or once it expired), build it from the DB and
+        store it unless another process got there first. Falls back to the DB if Redis is down.
+        """
+        client = get_redis_client()
+        try:
+            raw = client.get(OPERATOR_MAP_KEY)
+            if raw:
+                return cls.decode_cache(raw)
+        except redis.RedisError as e:
+            print(f"⚠️ Operator map Redis read failed, loading from DB: {e}")
+            return cls.build_cache(db_session)
+
+        cache = cls.build_cache(db_session)
+        try:
+            client.set(OPERATOR_MAP_KEY, orjson.dumps(cache), nx=True, ex=OPERATOR_MAP_TTL_SECONDS)
+        except redis.RedisError as e:
+            print(f"⚠️ Operator map Redis write failed: {e}")
+        return cache
+
+    @classmethod
+    def publish_cache(cls, db_session: Session) -> List[Tuple[int, str, str, bool]]:
+        """Rebuild the shared snapshot after operator_reference writes and notify subscribers."""
+        cache = cls.build_cache(db_session)
+        client = get_redis_client()
+        try:
+            client.set(OPERATOR_MAP_KEY, orjson.dumps(cache), ex=OPERATOR_MAP_TTL_SECONDS)
+            client.publish(OPERATOR_MAP_CHANNEL, "1")
+        except redis.RedisError as e:
+            print(f"⚠️ Operator map Redis publish failed: {e}")
+        return cache
 
     def refresh_cache(self) -> None:
         """Reload cache from operator_reference (only active rows)."""
-        rows = (
-            self.db_session.query(OperatorReference)
-            .filter(OperatorReference.is_active == True)  # noqa: E712
-            .all()
-        )
-        self.mappings_cache = [
-            (
-                row.id,
-                self.normalize_operator(row.operator_name),
-                row.application_name,
-                bool(row.is_p2p),
-            )
-            for row in rows
-            if row.operator_name and row.application_name
-        ]
+        self.mappings_cache = self.build_cache(self.db_session)
 
     def map_operator_details(self, operator_raw: str) -> Optional[Dict]:
         """
@@ -70,23 +236,27 @@ class OperatorMapper:
         if not normalized_input:
             return None
 
-        exact_match: Optional[Tuple[int, str, str, bool]] = None
-        best_substring: Optional[Tuple[int, str, str, bool]] = None
-        best_len = -1
-
-        for ref_id, pattern, app, is_p2p in self.mappings_cache:
-            if not pattern:
-                continue
-
-            if normalized_input == pattern:
-                exact_match = (ref_id, pattern, app, is_p2p)
-                break
+        index = _get_match_index(self.mappings_cache)
+        exact, automaton = index.exact, index.automaton
+        exact_match = exact.get(normalized_input)
+        best_substring: Optional[MappingEntry] = None
 
-            if pattern in normalized_input:
-                plen = len(pattern)
-                if plen > best_len:
-                    best_len = plen
-                    best_substring = (ref_id, pattern, app, is_p2p)
+        if exact_match is None:
+            if automaton is not None:
+                # One pass over the input finds every contained pattern; keep the longest,
+                # earliest in cache order on ties
+                best_key = None
+                for _, (order, entry) in automaton.iter(normalized_input):
+                    key = (-len(entry[1]), order)
+                    if best_key is None or key < best_key:
+                        best_key = key
+                        best_substring = entry
+            else:
+                best_len = -1
+                for entry in exact.values():
+                    if entry[1] in normalized_input and len(entry[1]) > best_len:
+                        best_len = len(entry[1])
+                        best_substring = entry
 
         chosen = exact_match or best_substring
         if not chosen:
@@ -110,13 +280,13 @@ class OperatorMapper:
 
     def get_existing_applications(self) -> List[str]:
         """Distinct active application names."""
-        apps = (
-            self.db_session.query(OperatorReference.application_name)
-            .filter(OperatorReference.is_active == True)  # noqa: E712
-            .distinct()
-            .all()
+        return list(
+            self.db_session.scalars(
+                select(OperatorReference.application_name)
+                .where(OperatorReference.is_active == True)  # noqa: E712
+                .distinct()
+            )
         )
-        return [row[0] for row in apps]
 
     def get_candidate_examples(self, operator_raw: str, limit: int = 10) -> List[Dict]:
         """
@@ -130,10 +300,17 @@ class OperatorMapper:
         input_tokens = set(normalized_input.split())
         candidates: List[Tuple[float, Tuple[int, str, str, bool]]] = []
 
-        for item in self.mappings_cache:
+        # Only rows that can score > 0: a shared token or a substring relation either way
+        index = _get_match_index(self.mappings_cache)
+        candidate_positions = set(index.positions_containing(normalized_input))
+        for token in input_tokens:
+            candidate_positions.update(index.token_index.get(token, ()))
+        for pattern in index.contained_patterns(normalized_input):
+            candidate_positions.update(index.positions[pattern])
+
+        for position in candidate_positions:
+            item = self.mappings_cache[position]
             ref_id, pattern, app, is_p2p = item
-            if not pattern:
-                continue
 
             score = 0.0
             if pattern == normalized_input:
@@ -148,8 +325,7 @@ class OperatorMapper:
             if score > 0:
                 candidates.append((score, item))
 
-        candidates.sort(key=lambda t: (-t[0], -len(t[1][1]), t[1][0]))
-        top = candidates[:limit]
+        top = heapq.nsmallest(limit, candidates, key=lambda t: (-t[0], -len(t[1][1]), t[1][0]))
 
         return [
             {
@@ -1,31 +1,57 @@
 """
 Parser orchestrator - coordinates regex and GPT parsers with operator mapping
 """
+import asyncio
 import os
 import re
-from typing import Dict, Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from parsers.regex_parser import RegexParser
 from parsers.gpt_parser import GPTParser
 from parsers.operator_mapper import OperatorMapper
 
+# Receiver fallbacks, compiled once at import
+RECEIVER_NAME_PATTERNS = tuple(re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+    r'(?:Receiver\s+name|Имя\s+получателя|Получатель)\s*:?\s*([А-ЯЁA-Z][а-яёa-zA-Z\s\-\']+)',
+    r'(?:Receiver|RECEIVER)\s*:?\s*([А-ЯЁA-Z][а-яёa-zA-Z\s\-\']+)',
+    r'(?:На\s+имя|Кому)\s*:?\s*([А-ЯЁA-Z][а-яёa-zA-Z\s\-\']+)',
+))
+RECEIVER_CARD_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(?:Receiver\s+card|Receiver|Получатель|Карта\s+получателя)\s*:?\s*([^\n\r]+)',
+    r'(?:на\s+карту|to\s+card)\s*:?\s*([^\n\r]+)',
+))
+NON_DIGIT_RE = re.compile(r'\D')
+
 
 class ParserOrchestrator:
     """Main parsing coordinator that cascades through parsing strategies"""
     
-    def __init__(self, db_session: Optional[Session], openai_api_key: Optional[str] = None, allow_missing_openai: bool = True):
+    def __init__(
+        self,
+        db_session: Optional[Session],
+        openai_api_key: Optional[str] = None,
+        allow_missing_openai: bool = True,
+        operator_mappings: Optional[List[Tuple[int, str, str, bool]]] = None,
+        gpt_parser: Optional[GPTParser] = None,
+    ):
         self.regex_parser = RegexParser()
-        self.gpt_parser = None
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         self.allow_missing_openai = allow_missing_openai
-        if self.openai_api_key:
+        # gpt_parser: injected parser; by default the process-wide one for the key (shared clients)
+        self.gpt_parser = gpt_parser
+        if self.gpt_parser is None and not self.openai_api_key and not allow_missing_openai:
+            raise ValueError("OpenAI API key is required")
+        if self.gpt_parser is None and self.openai_api_key:
             try:
-                self.gpt_parser = GPTParser(api_key=self.openai_api_key, allow_without_api_key=allow_missing_openai)
+                self.gpt_parser = GPTParser.get_shared(self.openai_api_key)
             except Exception as e:
                 print(f"⚠️ GPT parser unavailable at init: {e}")
                 self.gpt_parser = None
-        self.operator_mapper = OperatorMapper(db_session) if db_session is not None else None
+        # operator_mappings: optional OperatorMapper.build_cache snapshot, saves reloading the table per receipt
+        self.operator_mapper = OperatorMapper(db_session, operator_mappings) if db_session is not None else None
+        # The Session is not thread-safe: async paths run DB work in threads one at a time
+        self._db_lock = asyncio.Lock()
         
         # Confidence threshold for accepting regex results
         self.confidence_threshold = 0.8
@@ -49,34 +75,15 @@ class ParserOrchestrator:
         if not raw_text or not raw_text.strip():
             return None
         
-        parsed_data = None
-        
         # Step 1: Try regex parser
-        try:
-            parsed_data = self.regex_parser.parse(raw_text)
-            
-            # Check if result meets confidence threshold
-            if parsed_data and parsed_data.get('parsing_confidence', 0) >= self.confidence_threshold:
-                print(f"✅ Regex parsing successful: {parsed_data['parsing_method']}")
-            else:
-                print(f"⚠️  Regex confidence too low or failed, falling back to GPT")
-                parsed_data = None
-        except Exception as e:
-            print(f"❌ Regex parsing error: {e}")
-            parsed_data = None
+        parsed_data = self._parse_regex(raw_text)
         
         # Step 2: Fallback to GPT if regex failed and key is available
         if not parsed_data:
-            if not self.gpt_parser and self.openai_api_key:
+            gpt_parser = self._get_gpt_parser()
+            if gpt_parser:
                 try:
-                    self.gpt_parser = GPTParser(api_key=self.openai_api_key, allow_without_api_key=self.allow_missing_openai)
-                except Exception as e:
-                    print(f"⚠️ GPT parser instantiation failed: {e}")
-                    self.gpt_parser = None
-
-            if self.gpt_parser and self.gpt_parser.enabled:
-                try:
-                    parsed_data = self.gpt_parser.parse(raw_text)
+                    parsed_data = gpt_parser.parse(raw_text)
                     if parsed_data:
                         print(f"✅ GPT parsing successful")
                     else:
@@ -87,15 +94,125 @@ class ParserOrchestrator:
                     return None
             else:
                 # No GPT available; stay silent and return None
-                parsed_data = None
+                return None
         
+        return self._enrich(parsed_data, raw_text)
+
+    async def aprocess(self, raw_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Async variant of process(): regex runs inline, GPT calls are awaited on the
+        AsyncOpenAI client and DB lookups run in a worker thread, so the event loop
+        keeps serving other receipts meanwhile.
+        """
+        if not raw_text or not raw_text.strip():
+            return None
+
+        parsed_data = self._parse_regex(raw_text)
+        if not parsed_data:
+            gpt_parser = self._get_gpt_parser()
+            if not gpt_parser:
+                return None
+            parsed_data = await gpt_parser.aparse(raw_text)
+            if not parsed_data:
+                print(f"❌ GPT parsing also failed")
+                return None
+            print(f"✅ GPT parsing successful")
+
+        return await self._aenrich(parsed_data, raw_text)
+
+    async def process_many(self, raw_texts: List[str], concurrency: int = 20) -> List[Optional[Dict[str, Any]]]:
+        """
+        Process a batch of receipts: regex runs inline, and every receipt that needs
+        the GPT fallback is sent concurrently (GPTParser.parse_many) instead of one
+        round-trip at a time; application resolution overlaps the same way.
+        Results keep the order of raw_texts.
+        """
+        parsed: List[Optional[Dict[str, Any]]] = [None] * len(raw_texts)
+        needs_gpt: List[int] = []
+        for idx, raw_text in enumerate(raw_texts):
+            if not raw_text or not raw_text.strip():
+                continue
+            parsed[idx] = self._parse_regex(raw_text)
+            if not parsed[idx]:
+                needs_gpt.append(idx)
+
+        gpt_parser = self._get_gpt_parser() if needs_gpt else None
+        if gpt_parser:
+            gpt_results = await gpt_parser.parse_many([raw_texts[idx] for idx in needs_gpt], concurrency)
+            for idx, result in zip(needs_gpt, gpt_results):
+                parsed[idx] = result
+
+        async def enrich_one(data: Optional[Dict[str, Any]], raw_text: str) -> Optional[Dict[str, Any]]:
+            return await self._aenrich(data, raw_text) if data else None
+
+        return list(await asyncio.gather(*(enrich_one(d, t) for d, t in zip(parsed, raw_texts))))
+
+    def _parse_regex(self, raw_text: str) -> Optional[Dict[str, Any]]:
+        """Regex parse; None unless it meets the confidence threshold"""
+        try:
+            parsed_data = self.regex_parser.parse(raw_text)
+            
+            # Check if result meets confidence threshold
+            if parsed_data and parsed_data.get('parsing_confidence', 0) >= self.confidence_threshold:
+                print(f"✅ Regex parsing successful: {parsed_data['parsing_method']}")
+                return parsed_data
+            print(f"⚠️  Regex confidence too low or failed, falling back to GPT")
+        except Exception as e:
+            print(f"❌ Regex parsing error: {e}")
+        return None
+
+    def _get_gpt_parser(self) -> Optional[GPTParser]:
+        """GPT parser if one is configured and enabled"""
+        if self.gpt_parser and self.gpt_parser.enabled:
+            return self.gpt_parser
+        return None
+
+    def _enrich(self, parsed_data: Dict[str, Any], raw_text: str) -> Optional[Dict[str, Any]]:
+        """Post-validate, map the operator/application and mark GPT usage"""
+        parsed_data, needs_ai = self._validate_and_map(parsed_data, raw_text)
+        if needs_ai:
+            operator_raw = parsed_data['operator_raw']
+            try:
+                known_apps = self.operator_mapper.get_existing_applications()
+                hints = self.operator_mapper.get_candidate_examples(operator_raw, limit=10)
+                ai = self.gpt_parser.resolve_application(operator_raw, raw_text, known_apps, hints)
+                self._apply_ai_resolution(parsed_data, ai)
+            except Exception as e:
+                self._mapping_failed(parsed_data, e)
+        return self._mark_gpt_usage(parsed_data)
+
+    async def _aenrich(self, parsed_data: Dict[str, Any], raw_text: str) -> Optional[Dict[str, Any]]:
+        """Async variant of _enrich(): DB lookups in a thread, AI resolution awaited"""
+        async with self._db_lock:
+            parsed_data, needs_ai = await asyncio.to_thread(self._validate_and_map, parsed_data, raw_text)
+        if needs_ai:
+            operator_raw = parsed_data['operator_raw']
+            try:
+                async with self._db_lock:
+                    known_apps, hints = await asyncio.to_thread(self._resolution_context, operator_raw)
+                ai = await self.gpt_parser.aresolve_application(operator_raw, raw_text, known_apps, hints)
+                self._apply_ai_resolution(parsed_data, ai)
+            except Exception as e:
+                self._mapping_failed(parsed_data, e)
+        return self._mark_gpt_usage(parsed_data)
+
+    def _resolution_context(self, operator_raw: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Known applications and dictionary hints for AI resolution (DB reads)"""
+        known_apps = self.operator_mapper.get_existing_applications()
+        hints = self.operator_mapper.get_candidate_examples(operator_raw, limit=10)
+        return known_apps, hints
+
+    def _validate_and_map(
+        self, parsed_data: Dict[str, Any], raw_text: str
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Steps 3-4 up to the dictionary lookup; the flag says AI resolution should follow"""
         # Step 3: Post-validation and enrichment
         if parsed_data:
             try:
                 parsed_data = self._post_validate_and_enrich(parsed_data, raw_text)
             except Exception as e:
                 print(f"❌ Post-validation error: {e}")
-                return None
+                return None, False
 
         # Step 4: Resolve application via reference dictionary, then AI fallback
         if parsed_data and parsed_data.get('operator_raw') and self.operator_mapper:
@@ -112,47 +229,52 @@ class ParserOrchestrator:
                         "reference_id": match.get("reference_id"),
                     }
                     print(f"✅ Operator mapped: '{operator_raw}' → '{match['application_name']}' ({match['match_type']})")
+                elif self.gpt_parser and self.gpt_parser.enabled:
+                    # No dictionary hit; try AI resolution
+                    return parsed_data, True
                 else:
-                    # No dictionary hit; try AI resolution if available
-                    if self.gpt_parser and self.gpt_parser.enabled:
-                        known_apps = self.operator_mapper.get_existing_applications()
-                        hints = self.operator_mapper.get_candidate_examples(operator_raw, limit=10)
-                        ai = self.gpt_parser.resolve_application(operator_raw, raw_text, known_apps, hints)
-
-                        if ai and ai.get("application_name") and ai.get("application_name") != "Unknown" and ai.get("confidence", 0) >= 0.75:
-                            parsed_data["application_mapped"] = ai["application_name"]
-                            parsed_data["is_p2p"] = ai.get("is_p2p", parsed_data.get("is_p2p"))
-                            parsed_data["app_resolution"] = {
-                                "method": "AI",
-                                "confidence": ai.get("confidence"),
-                                "reasoning": ai.get("reasoning"),
-                                "recommended_operator_name": ai.get("recommended_operator_name"),
-                            }
-                            parsed_data["operator_reference_suggestion"] = {
-                                "operator_name": ai.get("recommended_operator_name") or operator_raw,
-                                "application_name": ai["application_name"],
-                                "is_p2p": ai.get("is_p2p"),
-                            }
-                            print(f"✅ AI-mapped operator: '{operator_raw}' → '{ai['application_name']}' (confidence {ai.get('confidence')})")
-                        else:
-                            # Heuristic fallback
-                            parsed_data["application_mapped"] = None
-                            parsed_data["is_p2p"] = 'P2P' in operator_raw.upper()
-                            parsed_data["app_resolution"] = {"method": "HEURISTIC"}
-                            print(f"⚠️  AI could not confidently map operator: '{operator_raw}'")
-                    else:
-                        parsed_data["application_mapped"] = None
-                        parsed_data["app_resolution"] = {"method": "HEURISTIC"}
-                        print(f"⚠️  No mapping found for operator and AI disabled: '{operator_raw}'")
+                    parsed_data["application_mapped"] = None
+                    parsed_data["app_resolution"] = {"method": "HEURISTIC"}
+                    print(f"⚠️  No mapping found for operator and AI disabled: '{operator_raw}'")
             except Exception as e:
-                print(f"❌ Operator mapping error: {e}")
-                if 'application_mapped' not in parsed_data:
-                    parsed_data['application_mapped'] = None
+                self._mapping_failed(parsed_data, e)
 
+        return parsed_data, False
+
+    def _apply_ai_resolution(self, parsed_data: Dict[str, Any], ai: Optional[Dict[str, Any]]) -> None:
+        """Use a confident AI answer, otherwise the P2P heuristic"""
+        operator_raw = parsed_data['operator_raw']
+        if ai and ai.get("application_name") and ai.get("application_name") != "Unknown" and ai.get("confidence", 0) >= 0.75:
+            parsed_data["application_mapped"] = ai["application_name"]
+            parsed_data["is_p2p"] = ai.get("is_p2p", parsed_data.get("is_p2p"))
+            parsed_data["app_resolution"] = {
+                "method": "AI",
+                "confidence": ai.get("confidence"),
+                "reasoning": ai.get("reasoning"),
+                "recommended_operator_name": ai.get("recommended_operator_name"),
+            }
+            parsed_data["operator_reference_suggestion"] = {
+                "operator_name": ai.get("recommended_operator_name") or operator_raw,
+                "application_name": ai["application_name"],
+                "is_p2p": ai.get("is_p2p"),
+            }
+            print(f"✅ AI-mapped operator: '{operator_raw}' → '{ai['application_name']}' (confidence {ai.get('confidence')})")
+        else:
+            # Heuristic fallback
+            parsed_data["application_mapped"] = None
+            parsed_data["is_p2p"] = 'P2P' in operator_raw.upper()
+            parsed_data["app_resolution"] = {"method": "HEURISTIC"}
+            print(f"⚠️  AI could not confidently map operator: '{operator_raw}'")
+
+    def _mapping_failed(self, parsed_data: Dict[str, Any], error: Exception) -> None:
+        print(f"❌ Operator mapping error: {error}")
+        if 'application_mapped' not in parsed_data:
+            parsed_data['application_mapped'] = None
+
+    def _mark_gpt_usage(self, parsed_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         # Step 5: Mark GPT usage
         if parsed_data:
             parsed_data['is_gpt_parsed'] = (parsed_data.get('parsing_method') == 'GPT')
-        
         return parsed_data
 
     def _post_validate_and_enrich(self, data: Dict[str, Any], raw_text: str) -> Dict[str, Any]:
@@ -175,9 +297,7 @@ class ParserOrchestrator:
         # card last4 fallback
         if not data.get('card_last_4'):
             try:
-                from parsers.regex_parser import RegexParser
-                fallback = RegexParser().extract_card_last4(raw_text)
-                data['card_last_4'] = fallback
+                data['card_last_4'] = self.regex_parser.extract_card_last4(raw_text)
             except Exception:
                 pass
 
@@ -196,13 +316,8 @@ class ParserOrchestrator:
 
     def _extract_receiver_name(self, text: str) -> Optional[str]:
         """Extract receiver name from receipt text"""
-        patterns = [
-            r'(?:Receiver\s+name|Имя\s+получателя|Получатель)\s*:?\s*([А-ЯЁA-Z][а-яёa-zA-Z\s\-\']+)',
-            r'(?:Receiver|RECEIVER)\s*:?\s*([А-ЯЁA-Z][а-яёa-zA-Z\s\-\']+)',
-            r'(?:На\s+имя|Кому)\s*:?\s*([А-ЯЁA-Z][а-яёa-zA-Z\s\-\']+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for pattern in RECEIVER_NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 name = match.group(1).strip()
                 # Filter out common false positives
@@ -212,15 +327,11 @@ class ParserOrchestrator:
 
     def _extract_receiver_card(self, text: str) -> Optional[str]:
         """Extract receiver card last 4 digits from receipt text"""
-        patterns = [
-            r'(?:Receiver\s+card|Receiver|Получатель|Карта\s+получателя)\s*:?\s*([^\n\r]+)',
-            r'(?:на\s+карту|to\s+card)\s*:?\s*([^\n\r]+)',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in RECEIVER_CARD_PATTERNS:
+            match = pattern.search(text)
             if match:
                 raw_value = match.group(1).strip()
-                digits = re.sub(r'\D', '', raw_value)
+                digits = NON_DIGIT_RE.sub('', raw_value)
                 if digits:
                     return digits[-4:]
                 if raw_value:
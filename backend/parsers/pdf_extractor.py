@@ -2,15 +2,20 @@
 PDF extraction utilities with OCR cascade support.
 
 Supports multiple extraction methods with fallback:
-1. pdfplumber (preferred for text-layer PDFs)
-2. PyMuPDF (backup text extraction)
+1. PyMuPDF (fast C text extraction for text-layer PDFs)
+2. pdfplumber (backup when PyMuPDF finds too little text)
 3. OCR via Tesseract (for scanned documents or sparse text)
 """
-import base64
+import binascii
+import hashlib
 import logging
 import os
 import tempfile
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import redis
 
 logger = logging.getLogger(__name__)
 
@@ -31,40 +36,213 @@ except ImportError:
 try:
     from pdf2image import convert_from_path
     import pytesseract
+    from PIL import ImageFilter
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
-    logger.warning("pdf2image/pytesseract not installed - OCR disabled")
+
+# Preferred OCR: pages rasterised by PyMuPDF in memory and recognised by a persistent
+# in-process Tesseract API (no poppler/tesseract subprocesses, traineddata loaded once)
+try:
+    import tesserocr
+    from PIL import Image, ImageFilter
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+if not (OCR_AVAILABLE or TESSEROCR_AVAILABLE):
+    logger.warning("tesserocr and pdf2image/pytesseract not installed - OCR disabled")
 
 MIN_TEXT_LENGTH = 80
 
+# Cascade order: "fast" reads the text layer with PyMuPDF first and only falls back to
+# pdfplumber when it is sparse; "accurate" starts with pdfplumber's layout-aware
+# extraction (slower, pure Python) for PDFs where PyMuPDF's order is not good enough
+EXTRACTION_STRATEGIES = ("fast", "accurate")
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Extracted text by PDF content (bytes) or file identity (path), so re-processing the
+# same receipt (Celery retries, duplicate uploads) skips the cascade and OCR entirely
+PDF_TEXT_CACHE_TTL = 7 * 86400
+_text_cache: Optional[redis.Redis] = None
+
+# Pages OCR'd at once. Threads are enough to use several cores: each pytesseract call
+# runs its own tesseract process, and tesserocr releases the GIL while recognising.
+# The Docker image sets OMP_THREAD_LIMIT=1 so these instances don't oversubscribe the CPUs.
+OCR_MAX_WORKERS = min(os.cpu_count() or 1, 4)
 
-def extract_text_from_pdf(path: str, max_pages: int = 2, use_ocr: bool = True) -> str:
+# OCR input: 200 dpi grayscale, sharpened. Tesseract's cost grows with the pixel count
+# (~0.44x of 300 dpi) and an unsharp mask restores the stroke edges lost to the lower dpi
+OCR_DPI = 200
+OCR_SHARPEN_RADIUS = 3
+OCR_SHARPEN_PERCENT = 150
+OCR_LANG = "rus+eng"
+# Load Tesseract into every OCR thread when a worker process starts (preload_ocr).
+# Off by default: each API holds the traineddata in memory and most receipts never need
+# OCR, so normally the pool and its APIs are created on the first scanned PDF.
+OCR_PRELOAD = os.getenv("OCR_PRELOAD", "").lower() in ("1", "true", "yes", "on")
+# Pages with less PyMuPDF text than this are OCR'd; the rest keep their text layer
+OCR_PAGE_MIN_CHARS = 20
+
+# Long-lived OCR threads, each keeping its own tesserocr API (APIs are not thread-safe)
+_ocr_executor: Optional[ThreadPoolExecutor] = None
+_tesserocr_local = threading.local()
+
+# Vision uploads: scanned/photo pages go out as JPEG (several times smaller than PNG);
+# vector/text-only pages stay PNG, which is smaller and sharper for flat text
+VISION_JPEG_QUALITY = 85
+# Longest rendered side in pixels: enough to read a receipt, and GPT-4o bills images
+# per 512px tile, so a full A4 page at 150+ dpi would cost several extra tiles
+VISION_MAX_SIDE_PX = 1536
+
+
+class PdfDocument:
+    """
+    PDF opened at most once with PyMuPDF and shared between text extraction and
+    page rendering. The document is parsed on first use, from a path or bytes.
+    """
+
+    def __init__(self, path: Optional[str] = None, data: Optional[bytes] = None):
+        if path is None and data is None:
+            raise ValueError("PdfDocument needs a path or PDF bytes")
+        self.path = path
+        self.data = data
+        self._doc: Optional["fitz.Document"] = None
+
+    @property
+    def doc(self) -> "fitz.Document":
+        if self._doc is None:
+            if self.data is not None:
+                self._doc = fitz.open(stream=self.data, filetype="pdf")
+            else:
+                self._doc = fitz.open(self.path)
+        return self._doc
+
+    def close(self) -> None:
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _get_text_cache() -> redis.Redis:
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+    return _text_cache
+
+
+def _text_cache_key(identity: str, max_pages: int, use_ocr: bool, strategy: str, min_length: int) -> str:
+    return f"pdf_text:{identity}:{max_pages}:{int(use_ocr)}:{strategy}:{min_length}"
+
+
+def _cached_text(key: str) -> Optional[str]:
+    try:
+        cached = _get_text_cache().get(key)
+    except redis.RedisError as err:
+        logger.debug("PDF text cache read failed: %s", err)
+        return None
+    return cached.decode("utf-8") if cached is not None else None
+
+
+def _store_text(key: str, text: str) -> None:
+    # Empty results may come from a transient failure; let the next attempt retry them
+    if not text:
+        return
+    try:
+        _get_text_cache().setex(key, PDF_TEXT_CACHE_TTL, text.encode("utf-8"))
+    except redis.RedisError as err:
+        logger.debug("PDF text cache write failed: %s", err)
+
+
+def extract_text_from_pdf(
+    path: str,
+    max_pages: int = 2,
+    use_ocr: bool = True,
+    pdf: Optional[PdfDocument] = None,
+    strategy: str = "fast",
+    min_length: int = MIN_TEXT_LENGTH,
+) -> str:
     """
     Extract text from PDF using cascade approach with multiple fallback methods.
 
-    Cascade:
-    1. pdfplumber (preferred where text layer exists)
-    2. PyMuPDF
+    Cascade ("fast"; "accurate" swaps steps 1 and 2):
+    1. PyMuPDF (returns early when the text layer has at least `min_length` chars)
+    2. pdfplumber if PyMuPDF text is sparse
     3. OCR via Tesseract if text is sparse or missing
+
+    Pass `pdf` to reuse an already opened PyMuPDF document (e.g. for rendering later).
+    Results are cached by (path, mtime, size).
     """
-    text = ""
+    _check_strategy(strategy)
+    stat = os.stat(path)
+    identity = hashlib.blake2b(
+        f"{os.path.realpath(path)}|{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    key = _text_cache_key(identity, max_pages, use_ocr, strategy, min_length)
+    text = _cached_text(key)
+    if text is None:
+        text = _extract_text(path, max_pages, use_ocr, pdf, strategy, min_length)
+        _store_text(key, text)
+    return text
 
-    if PDFPLUMBER_AVAILABLE:
-        text = _extract_with_pdfplumber(path, max_pages)
-        if text and len(text.strip()) >= MIN_TEXT_LENGTH:
-            logger.info(f"PDF text extracted via pdfplumber: {len(text)} chars")
-            return text
 
-    if not text:
-        text = _extract_with_pymupdf(path, max_pages)
-        if text and len(text.strip()) >= MIN_TEXT_LENGTH:
-            logger.info(f"PDF text extracted via PyMuPDF: {len(text)} chars")
-            return text
-
-    if use_ocr and OCR_AVAILABLE and len(text.strip()) < MIN_TEXT_LENGTH:
-        ocr_text = _extract_with_ocr(path, max_pages, lang='rus+eng')
-        if ocr_text:
+def _check_strategy(strategy: str) -> None:
+    if strategy not in EXTRACTION_STRATEGIES:
+        raise ValueError(f"Unknown PDF extraction strategy {strategy!r}; expected one of {EXTRACTION_STRATEGIES}")
+
+
+def _extract_text(
+    path: str,
+    max_pages: int,
+    use_ocr: bool,
+    pdf: Optional[PdfDocument],
+    strategy: str = "fast",
+    min_length: int = MIN_TEXT_LENGTH,
+) -> str:
+    if pdf is None:
+        # One PyMuPDF parse for the whole cascade: text, scan probe and OCR rendering
+        with PdfDocument(path) as own_pdf:
+            return _extract_text(path, max_pages, use_ocr, own_pdf, strategy, min_length)
+
+    plumber_text: Optional[str] = None
+    if strategy == "accurate" and PDFPLUMBER_AVAILABLE:
+        plumber_text = _extract_with_pdfplumber(path, max_pages)
+        if len(plumber_text.strip()) >= min_length:
+            logger.info(f"PDF text extracted via pdfplumber: {len(plumber_text)} chars")
+            return plumber_text
+
+    # PyMuPDF first: same text layer as pdfplumber, many times faster (C vs pure Python)
+    page_texts = _pymupdf_page_texts(pdf, max_pages)
+    text = _join_page_texts(page_texts)
+    scanned = not text.strip() and _has_page_images(pdf)
+    if text and len(text.strip()) >= min_length:
+        logger.info(f"PDF text extracted via PyMuPDF: {len(text)} chars")
+        return text
+
+    # A scan (no text layer, page images) has nothing for pdfplumber's layout walk either
+    if scanned:
+        logger.debug("PDF has no text layer, only images; skipping pdfplumber")
+    elif PDFPLUMBER_AVAILABLE:
+        if plumber_text is None:
+            plumber_text = _extract_with_pdfplumber(path, max_pages)
+            if len(plumber_text.strip()) >= min_length:
+                logger.info(f"PDF text extracted via pdfplumber: {len(plumber_text)} chars")
+                return plumber_text
+        if len(plumber_text.strip()) > len(text.strip()):
+            text = plumber_text
+
+    if use_ocr and (OCR_AVAILABLE or TESSEROCR_AVAILABLE) and len(text.strip()) < min_length:
+        # OCR only the pages without a usable text layer (all of them if none stands out)
+        pages = [i for i, page_text in enumerate(page_texts) if len(page_text.strip()) < OCR_PAGE_MIN_CHARS]
+        ocr_texts = _extract_with_ocr(path, max_pages, lang=OCR_LANG, pdf=pdf, pages=pages or None)
+        if any(page_text.strip() for page_text in ocr_texts.values()):
+            ocr_text = _merge_ocr_pages(page_texts, ocr_texts)
             logger.info(f"PDF text extracted via OCR: {len(ocr_text)} chars")
             return ocr_text
 
@@ -75,20 +253,44 @@ def extract_text_from_pdf(path: str, max_pages: int = 2, use_ocr: bool = True) -
     return ""
 
 
-def _extract_with_pymupdf(path: str, max_pages: int) -> str:
+def _pymupdf_page_texts(pdf: PdfDocument, max_pages: int) -> List[str]:
+    """Text of each of the first max_pages pages; empty if PyMuPDF fails."""
     try:
-        doc = fitz.open(path)
-        texts: List[str] = []
-        for page_index in range(min(max_pages, doc.page_count)):
-            page = doc.load_page(page_index)
-            page_text = page.get_text("text") or ""
-            if page_text.strip():
-                texts.append(page_text)
-        doc.close()
-        return "\n".join(texts).strip()
+        doc = pdf.doc
+        return [_mupdf_page_text(doc, page_index) for page_index in range(min(max_pages, doc.page_count))]
     except Exception as err:
         logger.debug("PyMuPDF extraction failed: %s", err)
-        return ""
+        return []
+
+
+def _join_page_texts(page_texts: List[str]) -> str:
+    return "\n".join(page_text for page_text in page_texts if page_text.strip()).strip()
+
+
+def _merge_ocr_pages(page_texts: List[str], ocr_texts: Dict[int, str]) -> str:
+    """Page texts in order, each OCR'd page replaced by its OCR text when that found anything."""
+    merged = list(page_texts)
+    merged.extend("" for _ in range(len(merged), max(ocr_texts) + 1))
+    for page_index, page_text in ocr_texts.items():
+        logger.debug("OCR extracted %s chars from page %s", len(page_text), page_index + 1)
+        if page_text.strip():
+            merged[page_index] = page_text
+    return _join_page_texts(merged)
+
+
+def _has_page_images(pdf: PdfDocument) -> bool:
+    try:
+        doc = pdf.doc
+        return doc.page_count > 0 and bool(doc.load_page(0).get_images())
+    except Exception as err:
+        logger.debug("PyMuPDF image probe failed: %s", err)
+        return False
+
+
+def _mupdf_page_text(doc: "fitz.Document", page_index: int) -> str:
+    # Content-stream order (sort=False is PyMuPDF's default, spelled out so nobody turns
+    # on the layout re-sort: receipts are single-column and don't need it)
+    return doc.load_page(page_index).get_text("text", sort=False) or ""
 
 
 def _extract_with_pdfplumber(path: str, max_pages: int) -> str:
@@ -107,37 +309,154 @@ def _extract_with_pdfplumber(path: str, max_pages: int) -> str:
         return ""
 
 
-def _extract_with_ocr(path: str, max_pages: int, lang: str = 'rus+eng', dpi: int = 300) -> str:
-    if not OCR_AVAILABLE:
-        return ""
+def _get_ocr_executor() -> ThreadPoolExecutor:
+    global _ocr_executor
+    if _ocr_executor is None:
+        _ocr_executor = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix="ocr")
+    return _ocr_executor
+
+
+def _sharpen_for_ocr(image):
+    return image.filter(ImageFilter.UnsharpMask(radius=OCR_SHARPEN_RADIUS, percent=OCR_SHARPEN_PERCENT))
+
+
+def preload_ocr(lang: str = OCR_LANG) -> None:
+    """
+    Start the OCR threads and load the traineddata into each one's tesserocr API,
+    so the first scanned receipt in a worker process doesn't pay for it.
+    No-op unless OCR_PRELOAD is set.
+    """
+    if not (OCR_PRELOAD and TESSEROCR_AVAILABLE):
+        return
+    # Each task holds its thread at the barrier, so every pool thread gets one
+    barrier = threading.Barrier(OCR_MAX_WORKERS)
+
+    def load() -> None:
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        _tesserocr_api(lang)
+
+    executor = _get_ocr_executor()
+    try:
+        for future in [executor.submit(load) for _ in range(OCR_MAX_WORKERS)]:
+            future.result()
+    except Exception as err:
+        logger.warning("OCR preload failed: %s", err)
+
+
+def shutdown_ocr() -> None:
+    """Stop the OCR threads; their tesserocr APIs are released as the threads exit."""
+    global _ocr_executor
+    if _ocr_executor is not None:
+        _ocr_executor.shutdown(wait=True)
+        _ocr_executor = None
+
+
+def _tesserocr_api(lang: str) -> "tesserocr.PyTessBaseAPI":
+    """This thread's persistent tesserocr API for lang."""
+    api = getattr(_tesserocr_local, "api", None)
+    if api is None or _tesserocr_local.lang != lang:
+        if api is not None:
+            api.End()
+        api = tesserocr.PyTessBaseAPI(lang=lang, psm=tesserocr.PSM.AUTO)
+        _tesserocr_local.api, _tesserocr_local.lang = api, lang
+    return api
+
+
+def _tesserocr_page_text(image: "Image.Image", lang: str, dpi: int) -> str:
+    """OCR one page on this thread's persistent tesserocr API."""
+    api = _tesserocr_api(lang)
+    api.SetImage(_sharpen_for_ocr(image))
+    api.SetSourceResolution(dpi)
+    return api.GetUTF8Text()
+
+
+def _pytesseract_page_text(image, lang: str, dpi: int) -> str:
+    return pytesseract.image_to_string(_sharpen_for_ocr(image), lang=lang, config=f"--dpi {dpi}")
+
+
+def _render_pages_for_ocr(pdf: PdfDocument, pages: List[int], dpi: int) -> List["Image.Image"]:
+    # Rendering stays on the calling thread (PyMuPDF is not thread-safe)
+    doc = pdf.doc
+    images: List["Image.Image"] = []
+    for page_index in pages:
+        pix = doc.load_page(page_index).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        images.append(Image.frombytes("L", (pix.width, pix.height), pix.samples))
+    return images
+
+
+def _extract_with_ocr(
+    path: str,
+    max_pages: int,
+    lang: str = OCR_LANG,
+    dpi: int = OCR_DPI,
+    pdf: Optional[PdfDocument] = None,
+    pages: Optional[List[int]] = None,
+) -> Dict[int, str]:
+    """OCR text by page index for `pages` (default: the first max_pages); empty if OCR fails."""
+    if pages is None:
+        pages = list(range(max_pages))
+
+    if TESSEROCR_AVAILABLE:
+        try:
+            if pdf is None:
+                with PdfDocument(path) as own_pdf:
+                    return _extract_with_ocr(path, max_pages, lang, dpi, own_pdf, pages)
+            pages = [page_index for page_index in pages if page_index < pdf.doc.page_count]
+            images = _render_pages_for_ocr(pdf, pages, dpi)
+            # Pages are independent: OCR them concurrently, map() keeps page order
+            page_texts = _get_ocr_executor().map(lambda image: _tesserocr_page_text(image, lang, dpi), images)
+            return dict(zip(pages, page_texts))
+        except Exception as err:
+            logger.debug("tesserocr OCR failed (%s); falling back to pytesseract", err)
+
+    if not OCR_AVAILABLE or not pages:
+        return {}
     try:
-        images = convert_from_path(
+        # One poppler run over the span of requested pages
+        first, last = min(pages), max(pages)
+        rendered = convert_from_path(
             path,
             dpi=dpi,
-            first_page=1,
-            last_page=max_pages
+            first_page=first + 1,
+            last_page=last + 1,
+            thread_count=min(OCR_MAX_WORKERS, last - first + 1),
+            grayscale=True,
         )
-
-        texts: List[str] = []
-        for i, image in enumerate(images):
-            text = pytesseract.image_to_string(image, lang=lang)
-            if text.strip():
-                texts.append(text)
-                logger.debug("OCR extracted %s chars from page %s", len(text), i + 1)
-
-        return "\n".join(texts).strip()
+        pages = [page_index for page_index in pages if page_index - first < len(rendered)]
+        images = [rendered[page_index - first] for page_index in pages]
+        page_texts = _get_ocr_executor().map(lambda image: _pytesseract_page_text(image, lang, dpi), images)
+        return dict(zip(pages, page_texts))
     except Exception as err:
         logger.debug("OCR extraction failed: %s", err)
-        return ""
+        return {}
+
 
+def extract_text_from_pdf_bytes(
+    pdf_bytes: bytes,
+    max_pages: int = 2,
+    use_ocr: bool = True,
+    strategy: str = "fast",
+    min_length: int = MIN_TEXT_LENGTH,
+) -> str:
+    """Extract text from PDF bytes (see extract_text_from_pdf), cached by content hash."""
+    _check_strategy(strategy)
+    digest = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+    key = _text_cache_key(digest, max_pages, use_ocr, strategy, min_length)
+    text = _cached_text(key)
+    if text is not None:
+        return text
 
-def extract_text_from_pdf_bytes(pdf_bytes: bytes, max_pages: int = 2, use_ocr: bool = True) -> str:
     with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
         tmp.write(pdf_bytes)
         tmp_path = tmp.name
 
     try:
-        return extract_text_from_pdf(tmp_path, max_pages, use_ocr)
+        text = _extract_text(tmp_path, max_pages, use_ocr, None, strategy, min_length)
+        _store_text(key, text)
+        return text
     finally:
         try:
             os.unlink(tmp_path)
@@ -145,37 +464,55 @@ def extract_text_from_pdf_bytes(pdf_bytes: bytes, max_pages: int = 2, use_ocr: b
             logger.warning("Failed to delete temp file %s: %s", tmp_path, err)
 
 
-def render_pdf_pages_to_png_base64(path: str, max_pages: int = 2, dpi: int = 150) -> List[str]:
+def render_pdf_pages_to_base64(
+    path: str,
+    max_pages: int = 2,
+    dpi: int = 150,
+    pdf: Optional[PdfDocument] = None,
+    fmt: Optional[str] = None,
+) -> List[str]:
     """
-    Render first `max_pages` pages of a PDF to PNG and return base64-encoded strings.
+    Render first `max_pages` pages of a PDF and return base64-encoded images:
+    JPEG for pages containing raster images, PNG for text-only pages, unless `fmt`
+    ("jpeg" or "png") forces one format for every page. `dpi` is capped so the
+    longest side stays within VISION_MAX_SIDE_PX.
+    Pass `pdf` to reuse a document already opened for text extraction.
     """
-    doc = fitz.open(path)
+    if pdf is None:
+        with PdfDocument(path) as own_pdf:
+            return _render_pages_to_base64(own_pdf, max_pages, dpi, fmt)
+    return _render_pages_to_base64(pdf, max_pages, dpi, fmt)
+
+
+def _render_pages_to_base64(pdf: PdfDocument, max_pages: int, dpi: int, fmt: Optional[str] = None) -> List[str]:
+    # Pages render serially on purpose: PyMuPDF is not thread-safe (not even across
+    # separate Document objects), and for the 1-2 receipt pages rendered here a
+    # process pool would cost more in startup and re-parsing than it saves
+    doc = pdf.doc
     images: List[str] = []
-    try:
-        zoom = dpi / 72.0
-        matrix = fitz.Matrix(zoom, zoom)
-        for page_index in range(min(max_pages, doc.page_count)):
-            page = doc.load_page(page_index)
-            pix = page.get_pixmap(matrix=matrix, alpha=False)
-            png_bytes = pix.tobytes("png")
-            images.append(base64.b64encode(png_bytes).decode("ascii"))
-    finally:
-        doc.close()
+    for page_index in range(min(max_pages, doc.page_count)):
+        page = doc.load_page(page_index)
+        # Lower the zoom up front for large pages, so each page is rendered only once
+        zoom = min(dpi / 72.0, VISION_MAX_SIDE_PX / max(page.rect.width, page.rect.height))
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        # JPEG also encodes several times faster than PNG's DEFLATE
+        page_fmt = fmt or ("jpeg" if page.get_images() else "png")
+        if page_fmt == "jpeg":
+            image_bytes = pix.tobytes("jpeg", jpg_quality=VISION_JPEG_QUALITY)
+        else:
+            image_bytes = pix.tobytes("png")
+        images.append(binascii.b2a_base64(image_bytes, newline=False).decode("ascii"))
     return images
 
 
-def render_pdf_bytes_to_png_base64(pdf_bytes: bytes, max_pages: int = 2, dpi: int = 150) -> List[str]:
+def render_pdf_bytes_to_base64(
+    pdf_bytes: bytes,
+    max_pages: int = 2,
+    dpi: int = 150,
+    fmt: Optional[str] = None,
+) -> List[str]:
     """
-    Convenience helper: render PDF bytes to PNG (base64) without exposing temp files to callers.
+    Convenience helper: render PDF bytes to base64 images, parsed straight from memory.
     """
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(pdf_bytes)
-        tmp_path = tmp.name
-
-    try:
-        return render_pdf_pages_to_png_base64(tmp_path, max_pages=max_pages, dpi=dpi)
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except Exception as err:  # pragma: no cover - best effort cleanup
-            logger.debug("Failed to cleanup temp PDF %s: %s", tmp_path, err)
+    with PdfDocument(data=pdf_bytes) as pdf:
+        return _render_pages_to_base64(pdf, max_pages, dpi, fmt)
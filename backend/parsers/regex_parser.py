@@ -6,49 +6,133 @@ import re
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from decimal import Decimal
-import pytz
+from zoneinfo import ZoneInfo
+
+# Regex patterns for different formats
+_PATTERN_SOURCES = {
+    'humo_notification': {
+        'amount': r'[➖➕💸]\s*([\d\s\.,]+)\s*(UZS|USD)',
+        'transaction_type': r'(Оплата|Пополнение|Операция|Конверсия)',
+        'card': r'(?:HUMO-?CARD|HUMOCARD|💳)\s*([\d\*]{6,})',
+        'operator': r'📍\s*(.+)',
+        'datetime': r'[🕓🕘]\s*(?:(\d{2}:\d{2})\s+(\d{2}\.\d{2}\.\d{2,4})|(\d{2}\.\d{2}\.\d{2,4})\s+(\d{2}:\d{2}))',
+        'balance': r'[💰💵]\s*([\d\s\.,]+)\s*(USD|UZS)',
+        'currency': r'(USD|UZS)',
+    },
+    'sms_inline': {
+        'operator': r'(?:Pokupka|Spisanie c karty|Popolnenie scheta|E-Com oplata|Platezh):\s*(.+?)(?:,|\s+\d{2}\.\d{2})',
+        'datetime': r'(\d{2}\.\d{2}\.\d{2})\s+(\d{2}:\d{2})',
+        'amount': r'summa:([\d\s\.,]+)\s*UZS',
+        'card': r'karta\s*\*{3}(\d{4})',
+        'balance': r'balans:([\d\s\.,]+)\s*UZS',
+        'type_keyword': r'^(Pokupka|Spisanie|Popolnenie|E-Com|Platezh|OTMENA)',
+    },
+    'semicolon_format': {
+        'card_amount': r'HUMOCARD\s*\*(\d{4}):\s*(oplata|popolnenie|operacija)\s+([\d\.]+)\s*UZS',
+        'operator': r';\s*([^;]+?)\s*;',
+        'datetime': r';\s*(\d{2})-(\d{2})-(\d{2})\s+(\d{2}:\d{2})',
+        'balance': r'Dostupno:\s*([\d\.]+)\s*UZS',
+    },
+    'cardxabar': {
+        'amount': r'[➖➕]\s*([\d\s\.,]+)\s*(USD|UZS)',
+        'card': r'💳\s*([\d\*]{6,})',
+        'operator': r'📍\s*(.+)',
+        'datetime': r'🕓\s*(?:(\d{2}:\d{2})\s+(\d{2}\.\d{2}\.\d{2,4})|(\d{2}\.\d{2}\.\d{2,4})\s+(\d{2}:\d{2}))',
+        'balance': r'[💰💵]\s*([\d\s\.,]+)\s*(USD|UZS)?',
+        'currency': r'(USD|UZS)',
+    }
+}
+
+# Compiled once at import; RegexParser is instantiated per receipt
+PATTERNS = {
+    fmt: {name: re.compile(pattern) for name, pattern in fields.items()}
+    for fmt, fields in _PATTERN_SOURCES.items()
+}
+
+# Masked card numbers: ***4862, *6714, 479091**6905, 532154**1744. Any text the longer
+# "digits**digits" forms match also contains a "*+dddd" match, found first, so this one
+# pattern covers them all and a receipt without a masked card costs one scan, not three.
+CARD_LAST4_RE = re.compile(r'\*+(\d{4})')
+
+
+class _AmountCharsTable(dict):
+    """str.translate table: ASCII digits, '.' and ',' map to themselves, anything else is dropped."""
+
+    def __missing__(self, codepoint: int) -> None:
+        self[codepoint] = None
+        return None
+
+
+_AMOUNT_TABLE = _AmountCharsTable((ord(c), c) for c in "0123456789.,")
+
+# Format anchors for RegexParser.parse, collected in one scan of the text
+FORMAT_MARKERS_RE = re.compile(
+    r'(?P<cardxabar>CardXabar|NBU Card|🔴|🟢)'
+    r'|(?P<humo>💸|💳|📍|🕓|🕘)'
+    r'|(?P<semicolon>HUMOCARD \*)'
+    r'|(?P<semicolon_sep>;)'
+    r'|(?P<sms>summa:)'
+    r'|(?P<sms_card>karta)'
+)
+
+# Start of each semicolon / SMS record in a digest of several receipts
+RECORD_START_RE = re.compile(
+    r'HUMOCARD\s*\*\d{4}:|^(?:Pokupka|Spisanie|Popolnenie|E-Com|Platezh|OTMENA)',
+    re.MULTILINE,
+)
+
+# Reversal / conversion keywords, matched case-insensitively without an upper() copy
+REVERSAL_RE = re.compile(r'OTMENA', re.IGNORECASE)
+CONVERSION_RE = re.compile(r'КОНВЕРС|CONVERS|KONVERS', re.IGNORECASE)
+
+# Operation keyword -> transaction_type
+HUMO_TYPE_MAP = {
+    'Оплата': 'DEBIT',
+    'Пополнение': 'CREDIT',
+    'Операция': 'DEBIT',
+    'Конверсия': 'CONVERSION',
+}
+SEMICOLON_TYPE_MAP = {'oplata': 'DEBIT', 'popolnenie': 'CREDIT', 'operacija': 'DEBIT'}
+
+# P2P transfer receipts (English labels)
+TRANSFER_RECEIVER_AMOUNT_RE = re.compile(r'Receiver amount\s+([\d\s\.,]+)\s*(UZS|USD)?', re.IGNORECASE)
+TRANSFER_SENDER_AMOUNT_RE = re.compile(r'Sender amount\s+([\d\s\.,]+)\s*(UZS|USD)?', re.IGNORECASE)
+TRANSFER_DATE_RE = re.compile(r'Transaction date\s+(\d{2}\.\d{2}\.\d{4})\s+(\d{2}:\d{2}:\d{2})', re.IGNORECASE)
+TRANSFER_SENDER_MASK_RE = re.compile(r'Sender\s+([0-9\*]{6,})', re.IGNORECASE)
+TRANSFER_RECEIVER_MASK_RE = re.compile(r'Receiver\s+([0-9\*]{6,})', re.IGNORECASE)
+TRANSFER_RECEIVER_NAME_RE = re.compile(r'Receiver name\s+([^\n\r]+)', re.IGNORECASE)
+
+# P2P transfer receipts (Russian labels)
+RU_SENDER_MASK_RE = re.compile(r'Отправителя\s+([0-9\*]{6,})', re.IGNORECASE)
+RU_RECEIVER_MASK_RE = re.compile(r'Получател[ьяя]?\s+([0-9\*]{6,})', re.IGNORECASE)
+RU_AMOUNT_RE = re.compile(r'Сумма(?:\s+отправителя)?\s+([\d\s\.,]+)\s*(UZS|USD)?', re.IGNORECASE)
+RU_DATE_RE = re.compile(r'Дата(?:\s+транзакции)?\s+(\d{2}\.\d{2}\.\d{4})\s+(\d{2}:\d{2}:\d{2})', re.IGNORECASE)
+RU_RECEIVER_NAME_RE = re.compile(r'(?:Receiver name|Имя\s+получател[ьяя]?|Имя\s+отправителя|Имя)\s+([^\n\r]+)', re.IGNORECASE)
+
+
+def _fixed_width_datetime(year: str, month: str, day: str, time_str: str) -> Optional[datetime]:
+    """
+    datetime from YYYY/MM/DD/HH:MM digit strings by slicing, several times cheaper than
+    strptime; None for any other shape, which callers hand to strptime instead.
+    """
+    if (
+        len(year) == 4 and len(month) == 2 and len(day) == 2
+        and len(time_str) == 5 and time_str[2] == ':'
+        and (year + month + day + time_str[:2] + time_str[3:]).isdecimal()
+    ):
+        return datetime(int(year), int(month), int(day), int(time_str[:2]), int(time_str[3:]))
+    return None
 
 
 class RegexParser:
     """Parser using regex patterns for structured receipt extraction"""
     
     def __init__(self, timezone: str = "Asia/Tashkent"):
-        self.tz = pytz.timezone(timezone)
+        # zoneinfo attaches via replace(); no pytz localize() offset lookup per date
+        self.tz = ZoneInfo(timezone)
         
-        # Regex patterns for different formats
-        self.patterns = {
-            'humo_notification': {
-                'amount': r'[➖➕💸]\s*([\d\s\.,]+)\s*(UZS|USD)',
-                'transaction_type': r'(Оплата|Пополнение|Операция|Конверсия)',
-                'card': r'(?:HUMO-?CARD|HUMOCARD|💳)\s*([\d\*]{6,})',
-                'operator': r'📍\s*(.+)',
-                'datetime': r'[🕓🕘]\s*(?:(\d{2}:\d{2})\s+(\d{2}\.\d{2}\.\d{2,4})|(\d{2}\.\d{2}\.\d{2,4})\s+(\d{2}:\d{2}))',
-                'balance': r'[💰💵]\s*([\d\s\.,]+)\s*(USD|UZS)',
-                'currency': r'(USD|UZS)',
-            },
-            'sms_inline': {
-                'operator': r'(?:Pokupka|Spisanie c karty|Popolnenie scheta|E-Com oplata|Platezh):\s*(.+?)(?:,|\s+\d{2}\.\d{2})',
-                'datetime': r'(\d{2}\.\d{2}\.\d{2})\s+(\d{2}:\d{2})',
-                'amount': r'summa:([\d\s\.,]+)\s*UZS',
-                'card': r'karta\s*\*{3}(\d{4})',
-                'balance': r'balans:([\d\s\.,]+)\s*UZS',
-                'type_keyword': r'^(Pokupka|Spisanie|Popolnenie|E-Com|Platezh|OTMENA)',
-            },
-            'semicolon_format': {
-                'card_amount': r'HUMOCARD\s*\*(\d{4}):\s*(oplata|popolnenie|operacija)\s+([\d\.]+)\s*UZS',
-                'operator': r';\s*([^;]+?)\s*;',
-                'datetime': r';\s*(\d{2})-(\d{2})-(\d{2})\s+(\d{2}:\d{2})',
-                'balance': r'Dostupno:\s*([\d\.]+)\s*UZS',
-            },
-            'cardxabar': {
-                'amount': r'[➖➕]\s*([\d\s\.,]+)\s*(USD|UZS)',
-                'card': r'💳\s*([\d\*]{6,})',
-                'operator': r'📍\s*(.+)',
-                'datetime': r'🕓\s*(?:(\d{2}:\d{2})\s+(\d{2}\.\d{2}\.\d{2,4})|(\d{2}\.\d{2}\.\d{2,4})\s+(\d{2}:\d{2}))',
-                'balance': r'[💰💵]\s*([\d\s\.,]+)\s*(USD|UZS)?',
-                'currency': r'(USD|UZS)',
-            }
-        }
+        # Shared precompiled per-format patterns
+        self.patterns = PATTERNS
     
     def parse_sender_receiver_transfer(self, text: str) -> Optional[Dict[str, Any]]:
         """
@@ -66,9 +150,9 @@ class RegexParser:
 
         amount = None
         currency = "UZS"
-        amount_match = re.search(r'Receiver amount\s+([\d\s\.,]+)\s*(UZS|USD)?', text, re.IGNORECASE)
+        amount_match = TRANSFER_RECEIVER_AMOUNT_RE.search(text)
         if not amount_match:
-            amount_match = re.search(r'Sender amount\s+([\d\s\.,]+)\s*(UZS|USD)?', text, re.IGNORECASE)
+            amount_match = TRANSFER_SENDER_AMOUNT_RE.search(text)
         if amount_match:
             try:
                 amount = self.normalize_amount(amount_match.group(1))
@@ -77,22 +161,21 @@ class RegexParser:
             if amount_match.lastindex and amount_match.group(2):
                 currency = amount_match.group(2).upper()
 
-        date_match = re.search(r'Transaction date\s+(\d{2}\.\d{2}\.\d{4})\s+(\d{2}:\d{2}:\d{2})', text, re.IGNORECASE)
+        date_match = TRANSFER_DATE_RE.search(text)
         transaction_date = None
         if date_match:
             try:
                 dt_str = f"{date_match.group(1)} {date_match.group(2)}"
-                transaction_date = self.tz.localize(datetime.strptime(dt_str, "%d.%m.%Y %H:%M:%S"))
+                transaction_date = datetime.strptime(dt_str, "%d.%m.%Y %H:%M:%S").replace(tzinfo=self.tz)
             except Exception:
                 pass
 
-        sender_mask = re.search(r'Sender\s+([0-9\*]{6,})', text, re.IGNORECASE)
-        receiver_mask = re.search(r'Receiver\s+([0-9\*]{6,})', text, re.IGNORECASE)
+        sender_mask = TRANSFER_SENDER_MASK_RE.search(text)
+        receiver_mask = TRANSFER_RECEIVER_MASK_RE.search(text)
         card_last_4 = self.extract_card_last4(sender_mask.group(1)) if sender_mask else None
         receiver_card = receiver_mask.group(1).strip() if receiver_mask else None
 
-        sender_name_match = re.search(r'Sender name\s+([^\n\r]+)', text, re.IGNORECASE)
-        receiver_name_match = re.search(r'Receiver name\s+([^\n\r]+)', text, re.IGNORECASE)
+        receiver_name_match = TRANSFER_RECEIVER_NAME_RE.search(text)
         receiver_name = receiver_name_match.group(1).strip() if receiver_name_match else None
 
         if not amount or not transaction_date:
@@ -121,10 +204,10 @@ class RegexParser:
         if "отправител" not in lower or "сумма" not in lower:
             return None
 
-        sender_mask = re.search(r'Отправителя\s+([0-9\*]{6,})', text, re.IGNORECASE)
-        receiver_mask = re.search(r'Получател[ьяя]?\s+([0-9\*]{6,})', text, re.IGNORECASE)
+        sender_mask = RU_SENDER_MASK_RE.search(text)
+        receiver_mask = RU_RECEIVER_MASK_RE.search(text)
 
-        amount_match = re.search(r'Сумма(?:\s+отправителя)?\s+([\d\s\.,]+)\s*(UZS|USD)?', text, re.IGNORECASE)
+        amount_match = RU_AMOUNT_RE.search(text)
         amount = None
         currency = "UZS"
         if amount_match:
@@ -135,18 +218,18 @@ class RegexParser:
             if amount_match.lastindex and amount_match.group(2):
                 currency = amount_match.group(2).upper()
 
-        date_match = re.search(r'Дата(?:\s+транзакции)?\s+(\d{2}\.\d{2}\.\d{4})\s+(\d{2}:\d{2}:\d{2})', text, re.IGNORECASE)
+        date_match = RU_DATE_RE.search(text)
         transaction_date = None
         if date_match:
             try:
                 dt_str = f"{date_match.group(1)} {date_match.group(2)}"
-                transaction_date = self.tz.localize(datetime.strptime(dt_str, "%d.%m.%Y %H:%M:%S"))
+                transaction_date = datetime.strptime(dt_str, "%d.%m.%Y %H:%M:%S").replace(tzinfo=self.tz)
             except Exception:
                 transaction_date = None
 
         operator_raw = "Uzum Bank"
 
-        receiver_name_match = re.search(r'(?:Receiver name|Имя\s+получател[ьяя]?|Имя\s+отправителя|Имя)\s+([^\n\r]+)', text, re.IGNORECASE)
+        receiver_name_match = RU_RECEIVER_NAME_RE.search(text)
         receiver_name = receiver_name_match.group(1).strip() if receiver_name_match else None
 
         card_last_4 = self.extract_card_last4(sender_mask.group(1)) if sender_mask else None
@@ -174,7 +257,10 @@ class RegexParser:
         """Normalize amount string to Decimal with robust thousand/decimal handling."""
         if amount_str is None:
             raise ValueError("Amount string is None")
-        cleaned = amount_str.strip().replace("\u00a0", "").replace(" ", "")
+        # One pass keeps only digits and separators (spaces, NBSP, currency, noise dropped)
+        cleaned = amount_str.translate(_AMOUNT_TABLE)
+        if cleaned.isdigit():
+            return Decimal(cleaned)
 
         has_dot = "." in cleaned
         has_comma = "," in cleaned
@@ -193,9 +279,6 @@ class RegexParser:
         elif has_comma and not has_dot:
             cleaned = cleaned.replace(",", ".")
 
-        # Strip all except digits and dot
-        cleaned = re.sub(r"[^0-9\.]", "", cleaned)
-
         if cleaned.count(".") > 1:
             parts = cleaned.split(".")
             cleaned = "".join(parts[:-1]) + "." + parts[-1]
@@ -207,16 +290,8 @@ class RegexParser:
 
     def extract_card_last4(self, text: str) -> Optional[str]:
         """Extract last 4 digits of card number from various masked formats."""
-        patterns = [
-            r'\*+(\d{4})',                # ***4862, *6714
-            r'\d+\*+(\d{4})',             # 479091**6905
-            r'\d+\*+\d*(\d{4})',          # 532154**1744
-        ]
-        for pat in patterns:
-            m = re.search(pat, text)
-            if m:
-                return m.group(1)
-        return None
+        m = CARD_LAST4_RE.search(text)
+        return m.group(1) if m else None
     
     def parse_date(self, date_str: str, time_str: str, format_type: str = 'standard') -> datetime:
         """Parse date and time strings to datetime object"""
@@ -225,18 +300,22 @@ class RegexParser:
                 # Format: YY-MM-DD HH:MM
                 year, month, day = date_str.split('-')
                 full_year = f"20{year}"
-                dt_str = f"{full_year}-{month}-{day} {time_str}"
-                dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
+                dt = _fixed_width_datetime(full_year, month, day, time_str)
+                if dt is None:
+                    dt_str = f"{full_year}-{month}-{day} {time_str}"
+                    dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
             else:
                 # Format: DD.MM.YYYY or DD.MM.YY
                 parts = date_str.split('.')
                 if len(parts[2]) == 2:
                     parts[2] = f"20{parts[2]}"
-                dt_str = f"{parts[0]}.{parts[1]}.{parts[2]} {time_str}"
-                dt = datetime.strptime(dt_str, "%d.%m.%Y %H:%M")
+                dt = _fixed_width_datetime(parts[2], parts[1], parts[0], time_str) if len(parts) == 3 else None
+                if dt is None:
+                    dt_str = f"{parts[0]}.{parts[1]}.{parts[2]} {time_str}"
+                    dt = datetime.strptime(dt_str, "%d.%m.%Y %H:%M")
             
             # Localize to Tashkent timezone
-            return self.tz.localize(dt)
+            return dt.replace(tzinfo=self.tz)
         except Exception as e:
             raise ValueError(f"Date parsing error: {e}")
     
@@ -245,27 +324,20 @@ class RegexParser:
         patterns = self.patterns['humo_notification']
         
         # Extract amount
-        amount_match = re.search(patterns['amount'], text)
+        amount_match = patterns['amount'].search(text)
         if not amount_match:
             return None
         amount = self.normalize_amount(amount_match.group(1))
         amount_currency = amount_match.group(2) if amount_match.lastindex and amount_match.lastindex >= 2 else None
         
         # Extract transaction type
-        type_match = re.search(patterns['transaction_type'], text)
-        type_map = {
-            'Оплата': 'DEBIT',
-            'Пополнение': 'CREDIT',
-            'Операция': 'DEBIT',
-            'Конверсия': 'CONVERSION'
-        }
+        type_match = patterns['transaction_type'].search(text)
         if type_match:
-            transaction_type = type_map.get(type_match.group(1), 'DEBIT')
+            transaction_type = HUMO_TYPE_MAP.get(type_match.group(1), 'DEBIT')
         else:
-            upper_text = text.upper()
-            if "OTMENA" in upper_text:
+            if REVERSAL_RE.search(text):
                 transaction_type = 'REVERSAL'
-            elif "КОНВЕРС" in upper_text or "CONVERS" in upper_text:
+            elif CONVERSION_RE.search(text):
                 transaction_type = 'CONVERSION'
             else:
                 transaction_type = 'CREDIT' if '➕' in text or '🎉' in text else 'DEBIT'
@@ -274,11 +346,11 @@ class RegexParser:
         card_last_4 = self.extract_card_last4(text)
         
         # Extract operator
-        operator_match = re.search(patterns['operator'], text)
+        operator_match = patterns['operator'].search(text)
         operator_raw = operator_match.group(1).strip() if operator_match else None
         
         # Extract datetime
-        datetime_match = re.search(patterns['datetime'], text)
+        datetime_match = patterns['datetime'].search(text)
         if not datetime_match:
             return None
         if datetime_match.group(1) and datetime_match.group(2):
@@ -290,13 +362,13 @@ class RegexParser:
         transaction_date = self.parse_date(date_str, time_str)
         
         # Extract balance
-        balance_match = re.search(patterns['balance'], text)
+        balance_match = patterns['balance'].search(text)
         balance_after = self.normalize_amount(balance_match.group(1)) if balance_match else None
         
         # Extract currency
         currency = amount_currency
         if not currency:
-            currency_match = re.search(patterns['currency'], text)
+            currency_match = patterns['currency'].search(text)
             currency = currency_match.group(1) if currency_match else 'UZS'
         
         return {
@@ -316,17 +388,17 @@ class RegexParser:
         patterns = self.patterns['sms_inline']
         
         # Extract amount
-        amount_match = re.search(patterns['amount'], text)
+        amount_match = patterns['amount'].search(text)
         if not amount_match:
             return None
         amount = self.normalize_amount(amount_match.group(1))
         
         # Extract operator
-        operator_match = re.search(patterns['operator'], text)
+        operator_match = patterns['operator'].search(text)
         operator_raw = operator_match.group(1).strip() if operator_match else None
         
         # Extract datetime
-        datetime_match = re.search(patterns['datetime'], text)
+        datetime_match = patterns['datetime'].search(text)
         if not datetime_match:
             return None
         date_str = datetime_match.group(1)
@@ -337,11 +409,11 @@ class RegexParser:
         card_last_4 = self.extract_card_last4(text)
         
         # Extract balance
-        balance_match = re.search(patterns['balance'], text)
+        balance_match = patterns['balance'].search(text)
         balance_after = self.normalize_amount(balance_match.group(1)) if balance_match else None
         
         # Determine transaction type
-        type_match = re.search(patterns['type_keyword'], text)
+        type_match = patterns['type_keyword'].search(text)
         if type_match:
             keyword = type_match.group(1)
             if keyword in ['Popolnenie']:
@@ -370,7 +442,7 @@ class RegexParser:
         patterns = self.patterns['semicolon_format']
         
         # Extract card, type, and amount
-        card_amount_match = re.search(patterns['card_amount'], text)
+        card_amount_match = patterns['card_amount'].search(text)
         if not card_amount_match:
             return None
         
@@ -379,15 +451,14 @@ class RegexParser:
         amount = self.normalize_amount(card_amount_match.group(3))
         
         # Map operation type
-        type_map = {'oplata': 'DEBIT', 'popolnenie': 'CREDIT', 'operacija': 'DEBIT'}
-        transaction_type = type_map.get(op_type, 'DEBIT')
+        transaction_type = SEMICOLON_TYPE_MAP.get(op_type, 'DEBIT')
         
         # Extract operator
-        operator_match = re.search(patterns['operator'], text)
+        operator_match = patterns['operator'].search(text)
         operator_raw = operator_match.group(1).strip() if operator_match else None
         
         # Extract datetime (YY-MM-DD format)
-        datetime_match = re.search(patterns['datetime'], text)
+        datetime_match = patterns['datetime'].search(text)
         if not datetime_match:
             return None
         
@@ -400,7 +471,7 @@ class RegexParser:
         transaction_date = self.parse_date(date_str, time_str, format_type='semicolon')
         
         # Extract balance
-        balance_match = re.search(patterns['balance'], text)
+        balance_match = patterns['balance'].search(text)
         balance_after = self.normalize_amount(balance_match.group(1)) if balance_match else None
         
         return {
@@ -419,7 +490,7 @@ class RegexParser:
         """Parse CardXabar-style emoji notifications."""
         patterns = self.patterns['cardxabar']
 
-        amount_match = re.search(patterns['amount'], text)
+        amount_match = patterns['amount'].search(text)
         if not amount_match:
             return None
         amount = self.normalize_amount(amount_match.group(1))
@@ -427,10 +498,10 @@ class RegexParser:
 
         card_last_4 = self.extract_card_last4(text)
 
-        operator_match = re.search(patterns['operator'], text)
+        operator_match = patterns['operator'].search(text)
         operator_raw = operator_match.group(1).strip() if operator_match else None
 
-        dt_match = re.search(patterns['datetime'], text)
+        dt_match = patterns['datetime'].search(text)
         if not dt_match:
             return None
         if dt_match.group(1) and dt_match.group(2):
@@ -441,17 +512,16 @@ class RegexParser:
             time_str = dt_match.group(4)
         transaction_date = self.parse_date(date_str, time_str)
 
-        balance_match = re.search(patterns['balance'], text)
+        balance_match = patterns['balance'].search(text)
         balance_after = self.normalize_amount(balance_match.group(1)) if balance_match and balance_match.group(1) else None
         if not currency and balance_match and balance_match.lastindex and balance_match.lastindex >= 2 and balance_match.group(2):
             currency = balance_match.group(2)
         if not currency:
             currency = 'UZS'
 
-        upper_text = text.upper()
-        if "OTMENA" in upper_text:
+        if REVERSAL_RE.search(text):
             transaction_type = 'REVERSAL'
-        elif "КОНВЕРС" in upper_text or "CONVERS" in upper_text or "CONVERSION" in upper_text or "КОНВЕРСИЯ" in upper_text or "KONVERS" in upper_text:
+        elif CONVERSION_RE.search(text):
             transaction_type = 'CONVERSION'
         elif '🟢' in text or '➕' in text:
             transaction_type = 'CREDIT'
@@ -480,8 +550,10 @@ class RegexParser:
         Returns:
             Parsed transaction dict or None if parsing failed
         """
+        markers = {match.lastgroup for match in FORMAT_MARKERS_RE.finditer(text)}
+
         # CardXabar style (red/green bullets, 💵 balance)
-        if any(marker in text for marker in ['CardXabar', 'NBU Card', '🔴', '🟢']):
+        if 'cardxabar' in markers:
             result = self.parse_cardxabar(text)
             if result:
                 return result
@@ -495,22 +567,40 @@ class RegexParser:
         if result:
             return result
 
-        if any(emoji in text for emoji in ['💸', '💳', '📍', '🕓', '🕘']):
+        if 'humo' in markers:
             result = self.parse_humo_notification(text)
             if result:
                 return result
         
         # Try semicolon format
-        if 'HUMOCARD *' in text and ';' in text:
+        if 'semicolon' in markers and 'semicolon_sep' in markers:
             result = self.parse_semicolon_format(text)
             if result:
                 return result
         
         # Try SMS inline format
-        if 'summa:' in text and 'karta' in text:
+        if 'sms' in markers and 'sms_card' in markers:
             result = self.parse_sms_inline(text)
             if result:
                 return result
         
         # All formats failed
         return None
+
+    def parse_many(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Parse text that may hold several concatenated SMS / semicolon receipts (digests).
+        One finditer pass finds the record boundaries, then each record is parsed on its
+        own; text with at most one record is parsed as a whole.
+        """
+        starts = [match.start() for match in RECORD_START_RE.finditer(text)]
+        if len(starts) < 2:
+            result = self.parse(text)
+            return [result] if result else []
+
+        results: List[Dict[str, Any]] = []
+        for start, end in zip(starts, starts[1:] + [len(text)]):
+            result = self.parse(text[start:end])
+            if result:
+                results.append(result)
+        return results
@@ -2,7 +2,6 @@
 One-time migration script to move data from checks table to transactions table.
 Run manually (e.g. `python -m backend.scripts.migrate_checks_to_transactions`).
 """
-import json
 from decimal import Decimal
 
 from sqlalchemy.orm import Session
@@ -35,15 +34,12 @@ def migrate():
             parsing_method = None
             parsing_confidence = None
             is_gpt_parsed = False
-            try:
-                if chk.metadata_json:
-                    meta = json.loads(chk.metadata_json)
-                    parsing_method = meta.get("parsing_method")
-                    parsing_confidence = meta.get("parsing_confidence")
-                    if parsing_method and str(parsing_method).upper().startswith("GPT"):
-                        is_gpt_parsed = True
-            except Exception:
-                pass
+            meta = chk.metadata_json  # JSONB -> dict
+            if isinstance(meta, dict):
+                parsing_method = meta.get("parsing_method")
+                parsing_confidence = meta.get("parsing_confidence")
+                if parsing_method and str(parsing_method).upper().startswith("GPT"):
+                    is_gpt_parsed = True
 
             txn = Transaction(
                 transaction_date=chk.datetime,
@@ -0,0 +1,13 @@
+-- Migration: 007_add_transaction_list_indexes.sql
+-- Description: indexes backing the paginated transactions list (GET /api/transactions)
+-- The composite (transaction_date DESC, id DESC) index matches the default ORDER BY,
+-- so the planner can walk the index and stop at LIMIT instead of sorting the filtered set.
+
+CREATE INDEX IF NOT EXISTS idx_transactions_date_id
+    ON transactions(transaction_date DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_type
+    ON transactions(transaction_type);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_currency
+    ON transactions(currency);
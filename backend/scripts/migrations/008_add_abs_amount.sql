@@ -0,0 +1,10 @@
+-- Migration: 008_add_abs_amount.sql
+-- Description: stored abs(amount) for the transactions list amount filters and sort
+-- amount is signed (DEBIT < 0), while the list filters and sorts by magnitude;
+-- filtering on abs(amount) directly cannot use an index.
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS abs_amount NUMERIC(18, 2) GENERATED ALWAYS AS (abs(amount)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_abs_amount
+    ON transactions(abs_amount);
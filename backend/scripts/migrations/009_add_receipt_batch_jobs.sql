@@ -0,0 +1,13 @@
+-- Migration: 009_add_receipt_batch_jobs.sql
+-- Description: background receipt batch jobs polled via
+-- GET /api/transactions/process-receipt-batch/jobs/{job_id}
+
+CREATE TABLE IF NOT EXISTS receipt_batch_jobs (
+    id UUID PRIMARY KEY,
+    chat_id BIGINT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    progress_json TEXT,
+    result_json TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
@@ -0,0 +1,7 @@
+-- Migration: 010_add_transactions_chat_msg_index.sql
+-- Description: (source_chat_id, source_message_id) lookup index for duplicate checks
+-- and GET /api/transactions/processed-status. Databases created from schema.sql
+-- lack the ORM's uq_transactions_source_msg constraint, so this lookup had no index.
+
+CREATE INDEX IF NOT EXISTS idx_transactions_chat_msg
+    ON transactions(source_chat_id, source_message_id);
@@ -0,0 +1,10 @@
+-- Migration: 011_partial_parsing_logs_failures_index.sql
+-- Description: idx_parsing_logs_failures covers failed attempts only (as in schema.sql).
+-- Databases created via SQLAlchemy create_all got a full created_at index instead,
+-- which is maintained on every (mostly successful) log insert.
+
+DROP INDEX IF EXISTS idx_parsing_logs_failures;
+
+CREATE INDEX idx_parsing_logs_failures
+    ON parsing_logs(created_at DESC)
+    WHERE success = FALSE;
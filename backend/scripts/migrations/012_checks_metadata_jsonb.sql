@@ -0,0 +1,13 @@
+-- Migration: 012_checks_metadata_jsonb.sql
+-- Description: checks.metadata is JSONB (as in production); databases created via
+-- SQLAlchemy create_all got TEXT from the old model definition.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'checks' AND column_name = 'metadata' AND data_type = 'text'
+    ) THEN
+        ALTER TABLE checks ALTER COLUMN metadata TYPE jsonb USING metadata::jsonb;
+    END IF;
+END $$;
@@ -0,0 +1,12 @@
+-- Migration: 013_brin_transactions_parsed_at.sql
+-- Description: parsed_at is set at insert time and only queried by range
+-- (analytics "last hour" window), so a BRIN index serves it at a fraction
+-- of the B-tree's size and insert cost.
+-- created_at and transaction_date keep their B-tree indexes: the list
+-- endpoint sorts by them, which BRIN cannot serve.
+
+DROP INDEX IF EXISTS idx_transactions_parsed_at;
+
+CREATE INDEX idx_transactions_parsed_at
+    ON transactions USING BRIN (parsed_at)
+    WITH (pages_per_range = 32);
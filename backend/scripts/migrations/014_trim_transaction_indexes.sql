@@ -0,0 +1,13 @@
+-- Migration: 014_trim_transaction_indexes.sql
+-- Description: align transaction indexes with the list endpoint's WHERE patterns.
+--   * idx_transactions_date duplicates the leading column of idx_transactions_date_id.
+--   * idx_transactions_amount is unused since amount filters/sorting moved to abs_amount (008).
+--   * idx_transactions_parsing (parsing_method, parsing_confidence) could not serve
+--     confidence thresholds on their own; lead with parsing_confidence instead.
+
+DROP INDEX IF EXISTS idx_transactions_date;
+DROP INDEX IF EXISTS idx_transactions_amount;
+DROP INDEX IF EXISTS idx_transactions_parsing;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_confidence_method
+    ON transactions(parsing_confidence, parsing_method);
@@ -0,0 +1,11 @@
+-- Migration: 015_operator_mappings_indexes.sql
+-- Description: idx_operator_mappings_pattern duplicates the UNIQUE(pattern) index.
+-- idx_operator_mappings_priority covers active rows only, in ORDER BY priority DESC order
+-- (as in schema.sql); databases created via create_all had a full ascending index.
+
+DROP INDEX IF EXISTS idx_operator_mappings_pattern;
+DROP INDEX IF EXISTS idx_operator_mappings_priority;
+
+CREATE INDEX idx_operator_mappings_priority
+    ON operator_mappings(priority DESC)
+    WHERE is_active = TRUE;
@@ -0,0 +1,9 @@
+-- Migration: 016_partial_transactions_card_index.sql
+-- Description: idx_transactions_card skips rows without a card (as in schema.sql).
+-- Databases created via SQLAlchemy create_all indexed every row, NULLs included.
+
+DROP INDEX IF EXISTS idx_transactions_card;
+
+CREATE INDEX idx_transactions_card
+    ON transactions(card_last_4)
+    WHERE card_last_4 IS NOT NULL;
@@ -0,0 +1,7 @@
+-- Migration: 017_add_amount_tiyin.sql
+-- Description: stored amount in tiyin (1/100 UZS) as BIGINT for dashboard aggregates.
+-- SUM over numeric runs arbitrary-precision arithmetic per row; over bigint it is
+-- a native integer add. amount stays the source of truth and the API field.
+
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS amount_tiyin BIGINT GENERATED ALWAYS AS (CAST(amount * 100 AS BIGINT)) STORED;
@@ -0,0 +1,8 @@
+-- Migration: 018_drop_transactions_dow_index.sql
+-- Description: drop the EXTRACT(dow FROM transaction_date) expression index.
+-- On the TIMESTAMPTZ column from schema.sql the expression depends on the session
+-- TimeZone, so it is not IMMUTABLE and cannot be indexed at all; it only existed on
+-- ORM-created databases (naive timestamp). A weekday matches ~1/7 of the rows,
+-- which the planner would rarely serve from an index anyway.
+
+DROP INDEX IF EXISTS idx_transactions_dow;
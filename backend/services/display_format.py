@@ -0,0 +1,17 @@
+"""Display labels for checks (weekday, date_display, time_display)."""
+from datetime import datetime
+
+WEEKDAY_LABELS = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс')
+MONTH_LABELS = ('янв', 'фев', 'мар', 'апр', 'май', 'июн', 'июл', 'авг', 'сен', 'окт', 'ноя', 'дек')
+
+
+def compute_weekday_label(dt: datetime) -> str:
+    return WEEKDAY_LABELS[dt.weekday()]
+
+
+def compute_date_display(dt: datetime) -> str:
+    return f"{dt.day} {MONTH_LABELS[dt.month - 1]}"
+
+
+def compute_time_display(dt: datetime) -> str:
+    return f"{dt.hour:02d}:{dt.minute:02d}"
@@ -1,23 +1,28 @@
 """Shared receipt processing logic for TDLib messages."""
 import asyncio
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, Optional, TYPE_CHECKING
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 import pytz
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from database.models import Transaction
+from parsers.operator_mapper import OperatorMapper
 from parsers.parser_orchestrator import ParserOrchestrator
-from parsers.pdf_extractor import extract_text_from_pdf, render_pdf_pages_to_png_base64
+from parsers.pdf_extractor import PdfDocument, extract_text_from_pdf, render_pdf_pages_to_base64
 from services.telegram_tdlib_manager import TDLibUnavailableError, TelegramTDLibManager
 
 if TYPE_CHECKING:
     # Avoid runtime circular import
     from api.routes.transactions import ProcessReceiptResponse, ParsingInfo
 
+TASHKENT_TZ = pytz.timezone("Asia/Tashkent")
+
 
 def compute_fingerprint(amount: Decimal, transaction_date: datetime, card_last4: str) -> str:
     """Compute SHA256 fingerprint for duplicate detection."""
@@ -34,8 +39,13 @@ async def process_tdlib_message(
     force: bool,
     db: Session,
     manager: TelegramTDLibManager,
+    operator_mappings: Optional[List[Tuple[int, str, str, bool]]] = None,
 ) -> "ProcessReceiptResponse":
-    """Process a Telegram message into a Transaction, reusing existing logic."""
+    """
+    Process a Telegram message into a Transaction, reusing existing logic.
+    operator_mappings: OperatorMapper snapshot (app.state.operator_map); the shared
+    Redis copy is loaded off the event loop when it is not given.
+    """
     # Late imports to break circular dependency
     from api.routes.transactions import (
         ProcessReceiptResponse,
@@ -91,8 +101,11 @@ async def process_tdlib_message(
         if mime_type and mime_type != "application/pdf":
             raise HTTPException(status_code=400, detail=f"Unsupported document type: {mime_type}")
 
+    if operator_mappings is None:
+        operator_mappings = await asyncio.to_thread(OperatorMapper.load_shared_cache, db)
+
     try:
-        orchestrator = ParserOrchestrator(db)
+        orchestrator = ParserOrchestrator(db, operator_mappings=operator_mappings)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"Parser initialization failed: {exc}")
 
@@ -120,66 +133,81 @@ async def process_tdlib_message(
         if not pdf_path:
             raise HTTPException(status_code=404, detail="PDF file not found")
 
-        try:
-            extracted_text = extract_text_from_pdf(pdf_path, max_pages=2)
-        except ImportError as exc:
-            raise HTTPException(status_code=500, detail=str(exc))
-        except Exception as exc:  # noqa: BLE001
-            parsing_notes = f"PDF text extraction failed: {exc}"
-            extracted_text = ""
-
-        combined_text = "\n\n".join([p for p in [caption, extracted_text] if p]).strip()
-        raw_text_for_parser = combined_text or caption or ""
-
-        # Try text-first parsing when we have meaningful text
-        if extracted_text and len(extracted_text) >= 80:
-            parsed = orchestrator.process(raw_text_for_parser)
-            conf = parsed.get("parsing_confidence") if parsed else None
-            if conf is None or conf < 0.75:
-                parsing_notes = (parsing_notes + "; " if parsing_notes else "") + "Text parse confidence low, trying vision"
-                parsed = None
-
-        # Vision fallback if text absent/short or parsing low confidence
-        if not parsed:
-            vision_used = True
+        # One PyMuPDF parse shared by the text fallback and vision rendering (opened on demand).
+        # Extraction/OCR and rendering block for seconds, so they run off the event loop;
+        # PyMuPDF is not thread-safe, so every use of pdf_doc (including close) stays on
+        # this one worker thread.
+        loop = asyncio.get_running_loop()
+        pdf_doc = PdfDocument(pdf_path)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf") as pdf_thread:
             try:
-                images_b64 = render_pdf_pages_to_png_base64(pdf_path, max_pages=2, dpi=150)
-            except ImportError as exc:
-                raise HTTPException(status_code=500, detail=str(exc))
-            except Exception as exc:  # noqa: BLE001
-                raise HTTPException(status_code=500, detail=f"Failed to render PDF: {exc}")
-
-            if not gpt_parser or not getattr(gpt_parser, "enabled", False):
-                raise HTTPException(
-                    status_code=503,
-                    detail="OpenAI API key not configured; cannot run vision parsing for PDF receipt",
-                )
-
-            parsed = gpt_parser.parse_from_images(images_b64, caption or extracted_text or "")
-            if not parsed:
-                raise HTTPException(status_code=422, detail="Cannot parse receipt from PDF images")
-
-            # Apply operator mapping manually for vision path
-            if parsed.get("operator_raw") and orchestrator.operator_mapper:
                 try:
-                    match = orchestrator.operator_mapper.map_operator_details(parsed["operator_raw"])
-                    if match:
-                        parsed["application_mapped"] = match.get("application_name")
-                        if match.get("is_p2p") is not None:
-                            parsed["is_p2p"] = match.get("is_p2p")
-                    else:
-                        parsed["application_mapped"] = None
-                except Exception:
-                    parsed["application_mapped"] = None
-
-            if not raw_text_for_parser:
-                raw_text_for_parser = caption or "[vision parsed PDF]"
+                    extracted_text = await loop.run_in_executor(
+                        pdf_thread, partial(extract_text_from_pdf, pdf_path, max_pages=2, pdf=pdf_doc)
+                    )
+                except ImportError as exc:
+                    raise HTTPException(status_code=500, detail=str(exc))
+                except Exception as exc:  # noqa: BLE001
+                    parsing_notes = f"PDF text extraction failed: {exc}"
+                    extracted_text = ""
+
+                combined_text = "\n\n".join([p for p in [caption, extracted_text] if p]).strip()
+                raw_text_for_parser = combined_text or caption or ""
+
+                # Try text-first parsing when we have meaningful text
+                if extracted_text and len(extracted_text) >= 80:
+                    parsed = await orchestrator.aprocess(raw_text_for_parser)
+                    conf = parsed.get("parsing_confidence") if parsed else None
+                    if conf is None or conf < 0.75:
+                        parsing_notes = (parsing_notes + "; " if parsing_notes else "") + "Text parse confidence low, trying vision"
+                        parsed = None
+
+                # Vision fallback if text absent/short or parsing low confidence
+                if not parsed:
+                    vision_used = True
+                    try:
+                        images_b64 = await loop.run_in_executor(
+                            pdf_thread,
+                            partial(render_pdf_pages_to_base64, pdf_path, max_pages=2, dpi=150, pdf=pdf_doc),
+                        )
+                    except ImportError as exc:
+                        raise HTTPException(status_code=500, detail=str(exc))
+                    except Exception as exc:  # noqa: BLE001
+                        raise HTTPException(status_code=500, detail=f"Failed to render PDF: {exc}")
+
+                    if not gpt_parser or not getattr(gpt_parser, "enabled", False):
+                        raise HTTPException(
+                            status_code=503,
+                            detail="OpenAI API key not configured; cannot run vision parsing for PDF receipt",
+                        )
+
+                    parsed = await gpt_parser.aparse_from_images(images_b64, caption or extracted_text or "")
+                    if not parsed:
+                        raise HTTPException(status_code=422, detail="Cannot parse receipt from PDF images")
+
+                    # Apply operator mapping manually for vision path
+                    if parsed.get("operator_raw") and orchestrator.operator_mapper:
+                        try:
+                            match = orchestrator.operator_mapper.map_operator_details(parsed["operator_raw"])
+                            if match:
+                                parsed["application_mapped"] = match.get("application_name")
+                                if match.get("is_p2p") is not None:
+                                    parsed["is_p2p"] = match.get("is_p2p")
+                            else:
+                                parsed["application_mapped"] = None
+                        except Exception:
+                            parsed["application_mapped"] = None
+
+                    if not raw_text_for_parser:
+                        raw_text_for_parser = caption or "[vision parsed PDF]"
+            finally:
+                await loop.run_in_executor(pdf_thread, pdf_doc.close)
 
     else:
         raw_text_for_parser = text
         if not raw_text_for_parser:
             raise HTTPException(status_code=422, detail="Empty message content")
-        parsed = orchestrator.process(raw_text_for_parser)
+        parsed = await orchestrator.aprocess(raw_text_for_parser)
 
     if not parsed:
         raise HTTPException(status_code=422, detail="Cannot parse receipt")
@@ -193,11 +221,10 @@ async def process_tdlib_message(
     if not transaction_date:
         raise HTTPException(status_code=422, detail="Parsed data missing transaction_date")
 
-    tz = pytz.timezone("Asia/Tashkent")
     if transaction_date.tzinfo:
-        transaction_date = transaction_date.astimezone(tz)
+        transaction_date = transaction_date.astimezone(TASHKENT_TZ)
     else:
-        transaction_date = tz.localize(transaction_date)
+        transaction_date = TASHKENT_TZ.localize(transaction_date)
 
     amount_val = parsed.get("amount")
     if amount_val is None:
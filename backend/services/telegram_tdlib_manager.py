@@ -5,7 +5,6 @@ TDLib-based Telegram client manager
 """
 import asyncio
 import ctypes
-import json
 import logging
 import os
 import threading
@@ -13,6 +12,7 @@ import time
 import uuid
 from typing import Any, Dict, List, Optional, Callable, Awaitable
 
+import orjson
 from sqlalchemy.orm import Session
 
 from database.models import HiddenBotChat
@@ -43,23 +43,25 @@ class TDJsonClient:
 
         self.client = self.lib.td_json_client_create()
 
+    # Every TDLib update passes through receive(); orjson works on the raw
+    # bytes directly, skipping the str encode/decode round-trip.
     def send(self, query: Dict[str, Any]) -> None:
-        self.lib.td_json_client_send(self.client, json.dumps(query).encode("utf-8"))
+        self.lib.td_json_client_send(self.client, orjson.dumps(query))
 
     def receive(self, timeout: float = 0.5) -> Optional[Dict[str, Any]]:
         result = self.lib.td_json_client_receive(self.client, ctypes.c_double(timeout))
         if result:
             data = ctypes.cast(result, ctypes.c_char_p).value
             if data:
-                return json.loads(data.decode("utf-8"))
+                return orjson.loads(data)
         return None
 
     def execute(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        result = self.lib.td_json_client_execute(self.client, json.dumps(query).encode("utf-8"))
+        result = self.lib.td_json_client_execute(self.client, orjson.dumps(query))
         if result:
             data = ctypes.cast(result, ctypes.c_char_p).value
             if data:
-                return json.loads(data.decode("utf-8"))
+                return orjson.loads(data)
         return None
 
     def destroy(self) -> None:
@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 
@@ -10,6 +11,11 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+# API route modules validate auth settings at import time
+os.environ.setdefault("TELEGRAM_API_ID", "0")
+os.environ.setdefault("TELEGRAM_API_HASH", "test")
+os.environ.setdefault("JWT_SECRET", "test")
+
 from database.models import Base
 
 
@@ -0,0 +1,95 @@
+import asyncio
+
+from parsers.gpt_parser import GPTParser, TransactionSchema
+
+
+class DictCache:
+    """In-memory stand-in for the Redis response cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+
+class FailingClient:
+    """Any OpenAI call is a cache miss the test did not expect."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"unexpected OpenAI call: {name}")
+
+
+def make_parser():
+    parser = GPTParser(api_key="sk-test")
+    parser.cache = DictCache()
+    parser.client = FailingClient()
+    parser._build_async_client = FailingClient
+    return parser
+
+
+def test_async_parse_and_resolve_use_response_cache():
+    parser = make_parser()
+    text = "Оплата 10 000 UZS HUMOCARD *6714 14.04.2025 12:01"
+    schema = TransactionSchema(
+        amount=10000,
+        transaction_date_iso="2025-04-14T12:01:00",
+        transaction_type="DEBIT",
+        confidence=0.9,
+    )
+    parser.cache.setex(parser._parse_cache_key(parser._text_request(text)), 0, schema.model_dump_json())
+
+    expected = parser.parse(text)
+    assert expected["amount"] == 10000
+    assert asyncio.run(parser.aparse(text)) == expected
+    assert asyncio.run(parser.parse_many([text])) == [expected]
+    assert parser.parse_bulk([text]) == [expected]
+
+    resolved = {"application_name": "Payme", "is_p2p": False, "confidence": 0.9}
+    args = ("PAYME", text, ["Payme", "Click"], [])
+    parser.cache.setex(parser._resolve_cache_key("gpt-4o-mini", "PAYME", ["Payme", "Click"]), 0, '{"application_name": "Payme", "is_p2p": false, "confidence": 0.9}')
+    assert parser.resolve_application(*args) == resolved
+    assert asyncio.run(parser.aresolve_application(*args)) == resolved
+
+
+def test_resolve_cache_key_is_operator_and_known_apps():
+    parser = make_parser()
+    key = parser._resolve_cache_key("gpt-4o-mini", "Payme  uz", ["Payme", "Click"])
+    assert key == parser._resolve_cache_key("gpt-4o-mini", "PAYME UZ", ["Click", "Payme"])
+    assert key != parser._resolve_cache_key("gpt-4o-mini", "PAYME UZ", ["Payme"])
+    assert key != parser._resolve_cache_key("gpt-4o-mini", "CLICK", ["Click", "Payme"])
+
+
+def test_async_resources_follow_the_event_loop():
+    parser = make_parser()
+
+    async def resources():
+        return parser.request_slots, parser.request_slots
+
+    first, again = asyncio.run(resources())
+    second, _ = asyncio.run(resources())
+    assert first is again
+    assert first is not second
+
+
+def test_aclose_closes_the_loop_client():
+    parser = make_parser()
+    closed = []
+
+    class ClosableClient:
+        async def close(self):
+            closed.append(self)
+
+    parser._build_async_client = ClosableClient
+
+    async def use_and_close():
+        client = parser.async_client
+        await parser.aclose()
+        return client, parser.async_client
+
+    client, fresh = asyncio.run(use_and_close())
+    assert closed == [client]
+    assert fresh is not client
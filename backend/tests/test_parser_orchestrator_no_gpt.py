@@ -1,3 +1,7 @@
+import asyncio
+
+import pytest
+
 from parsers.parser_orchestrator import ParserOrchestrator
 
 
@@ -6,3 +10,23 @@ def test_orchestrator_without_openai_returns_none():
     text = "Unparsable text without known format"
     res = orchestrator.process(text)
     assert res is None
+
+
+def test_orchestrator_requires_openai_key_when_not_allowed_missing(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        ParserOrchestrator(db_session=None, openai_api_key=None, allow_missing_openai=False)
+
+
+def test_async_process_matches_sync_without_openai():
+    orchestrator = ParserOrchestrator(db_session=None, openai_api_key=None, allow_missing_openai=True)
+    text = """💸 Оплата
+➖ 10.035.000,00 UZS
+📍 ChakanaPay Humo Uzca
+💳 HUMOCARD *6714
+🕓 12:01 14.04.2025
+💰 3.547.712,00 UZS"""
+    expected = orchestrator.process(text)
+    assert expected
+    assert asyncio.run(orchestrator.aprocess(text)) == expected
+    assert asyncio.run(orchestrator.process_many([text, "Unparsable text without known format"])) == [expected, None]
@@ -153,3 +153,24 @@ def test_cardxabar_conversion_usd(parser):
     assert res
     assert res["transaction_type"] == "CONVERSION"
     assert res["currency"] == "USD"
+
+
+def test_parse_many_splits_semicolon_digest(parser):
+    text = (
+        "HUMOCARD *6921: oplata 50000.00 UZS; OOO FIRST ; 25-04-14 12:00; Dostupno: 100.00 UZS\n"
+        "HUMOCARD *6921: popolnenie 20000.00 UZS; OOO SECOND ; 25-04-14 13:30; Dostupno: 120.00 UZS"
+    )
+    res = parser.parse_many(text)
+    assert [r["operator_raw"] for r in res] == ["OOO FIRST", "OOO SECOND"]
+    assert [r["transaction_type"] for r in res] == ["DEBIT", "CREDIT"]
+    assert res[1]["amount"] == Decimal("20000.00")
+
+
+def test_parse_many_single_receipt(parser):
+    text = """💸 Оплата
+➖ 10.035.000,00 UZS
+📍 ChakanaPay Humo Uzca
+💳 HUMOCARD *6714
+🕓 12:01 14.04.2025
+💰 3.547.712,00 UZS"""
+    assert parser.parse_many(text) == [parser.parse(text)]
@@ -0,0 +1,77 @@
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+
+from api.routes.transactions import (
+    TRANSACTION_LIST_COLUMNS,
+    TransactionResponse,
+    build_transaction_response,
+    transaction_response_fields,
+)
+from database.models import Transaction
+
+
+def make_transaction(**overrides):
+    values = dict(
+        id=1,
+        raw_message="💸 Оплата\n➖ 400.000,00 UZS\n📍 OQ P2P>TASHKENT",
+        source_type="AUTO",
+        source_chat_id=915326936,
+        source_message_id=10,
+        transaction_date=datetime(2025, 4, 5, 12, 58),
+        amount=Decimal("-400000.00"),
+        currency="UZS",
+        card_last_4="6714",
+        operator_raw="OQ P2P>TASHKENT",
+        application_mapped="OQ P2P",
+        transaction_type="DEBIT",
+        balance_after=Decimal("535000.40"),
+        parsing_method="REGEX_HUMO",
+        parsing_confidence=0.95,
+        is_gpt_parsed=False,
+        is_p2p=True,
+        created_at=datetime(2025, 4, 5, 13, 0),
+        updated_at=datetime(2025, 4, 5, 13, 0),
+    )
+    values.update(overrides)
+    return Transaction(**values)
+
+
+def test_constructed_response_matches_validated_schema():
+    # build_transaction_response skips validation, so its output must survive a validating round-trip unchanged
+    response = build_transaction_response(make_transaction())
+    validated = TransactionResponse.model_validate(response.model_dump())
+
+    assert validated == response
+    assert isinstance(response.amount, str)
+    assert response.amount == "400000.00"
+    assert response.balance_after == "535000.40"
+    assert response.transaction_type == "DEBIT"
+    assert response.source_channel == "TELEGRAM"
+
+
+def test_constructed_response_with_optional_fields_missing():
+    tx = make_transaction(
+        balance_after=None,
+        card_last_4=None,
+        parsing_confidence=None,
+        updated_at=None,
+        raw_message="Pokupka: SHOP, 02.04.25 11:48 karta ***0907. summa:80000.00 UZS",
+        source_type="MANUAL",
+    )
+    response = build_transaction_response(tx)
+    validated = TransactionResponse.model_validate(response.model_dump())
+
+    assert validated == response
+    assert response.balance_after is None
+    assert response.source_type == "MANUAL"
+    assert response.source_channel == "MANUAL"
+
+
+def test_list_projection_covers_response_fields():
+    # The list endpoint feeds projected rows (not ORM objects) to the builder
+    tx = make_transaction()
+    keys = [column.key for column in TRANSACTION_LIST_COLUMNS]
+    row = namedtuple("Row", keys)(*(getattr(tx, key) for key in keys))
+
+    assert transaction_response_fields(row) == transaction_response_fields(tx)
@@ -0,0 +1,29 @@
+import pytest
+
+from api.routes.transactions import infer_transaction_type
+
+
+CASES = [
+    ("DEBIT", "💸 Оплата\n➖ 400.000,00 UZS", "DEBIT"),
+    (None, "🎉 Пополнение\n➕ 1.000.000,00 UZS", "CREDIT"),
+    (None, "OTMENA Pokupka: SHOP, karta ***0907. summa:80000.00 UZS", "REVERSAL"),
+    ("CONVERSION", None, "CONVERSION"),
+    (None, "Конверсия ➖ 100,00 USD", "CONVERSION"),
+    (None, "🔴 Отмена операции\n➕ 80.000,00 UZS", "REVERSAL"),
+    (None, "Popolnenie scheta: PAYME, summa:50000.00 UZS", "CREDIT"),
+    (None, "E-Com oplata: UZUM MARKET, summa:1000.00 UZS", "DEBIT"),
+    ("CREDIT", "", "CREDIT"),
+    (None, None, "DEBIT"),
+    (None, "no keywords at all", "DEBIT"),
+]
+
+
+@pytest.mark.parametrize("raw_type,raw_text,expected", CASES)
+def test_infer_transaction_type(raw_type, raw_text, expected):
+    assert infer_transaction_type(raw_type, raw_text) == expected
+
+
+@pytest.mark.parametrize("raw_type,raw_text,expected", CASES)
+def test_infer_transaction_type_is_idempotent(raw_type, raw_text, expected):
+    # Update handlers reuse an already inferred type for the amount sign
+    assert infer_transaction_type(expected, raw_text) == expected
@@ -2,17 +2,22 @@
 Celery worker for async receipt processing (checks table)
 """
 import os
-import json
 import logging
 import re
 import hashlib
+import time
 from datetime import datetime
 from decimal import Decimal
 
+import orjson
 import pytz
 import httpx
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from dotenv import load_dotenv
+from kombu.serialization import register
+
+from services.display_format import compute_date_display, compute_time_display, compute_weekday_label
 
 load_dotenv()
 
@@ -23,11 +28,20 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 BACKEND_INTERNAL_URL = os.getenv("BACKEND_INTERNAL_URL", "http://backend:8000")
 app = Celery('uzbek_parser_worker', broker=REDIS_URL, backend=REDIS_URL)
 
+# orjson for message bodies (C encoder, compact output); plain json is still accepted
+register(
+    'orjson',
+    orjson.dumps,
+    orjson.loads,
+    content_type='application/x-orjson',
+    content_encoding='utf-8',
+)
+
 # Celery settings
 app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer='orjson',
+    accept_content=['orjson', 'json'],
+    result_serializer='orjson',
     timezone='Asia/Tashkent',
     enable_utc=True,
     task_track_started=True,
@@ -36,8 +50,31 @@ app.conf.update(
 )
 
 
+@worker_process_init.connect
+def preload_ocr_on_start(**kwargs):
+    """With OCR_PRELOAD set, load Tesseract when the process starts instead of on its first scanned PDF."""
+    from parsers.pdf_extractor import preload_ocr
+    preload_ocr()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_ocr_on_exit(**kwargs):
+    from parsers.pdf_extractor import shutdown_ocr
+    shutdown_ocr()
+
+
 TASHKENT_TZ = pytz.timezone("Asia/Tashkent")
+
+# Per-process copy of the shared operator_reference snapshot (OperatorMapper.build_cache layout,
+# kept in Redis). The reference table changes rarely, so tasks share it instead of reloading it per receipt.
+# The Redis copy expires after the same interval, so a refresh falls back to the DB and also sees
+# writes that were never published.
+OPERATOR_MAP_TTL_SECONDS = 300
+_operator_map = None
+_operator_map_loaded_at = 0.0
 EMOJI_PATTERN = re.compile(r"[\U0001F300-\U0001FAFF\U00002600-\U000027BF]")
+MASKED_LAST4_PATTERN = re.compile(r"\*+(\d{4})")
 
 
 def to_tashkent_naive(dt: datetime) -> datetime:
@@ -49,25 +86,11 @@ def to_tashkent_naive(dt: datetime) -> datetime:
     return dt
 
 
-def compute_weekday_label(dt: datetime) -> str:
-    weekdays = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
-    return weekdays[dt.weekday()]
-
-
-def compute_date_display(dt: datetime) -> str:
-    months = ['янв', 'фев', 'мар', 'апр', 'май', 'июн', 'июл', 'авг', 'сен', 'окт', 'ноя', 'дек']
-    return f"{dt.day} {months[dt.month - 1]}"
-
-
-def compute_time_display(dt: datetime) -> str:
-    return dt.strftime("%H:%M")
-
-
 def extract_card_last4(raw_text: str, fallback: str = "0000") -> str:
     """Try to extract last4 after asterisks."""
     if not raw_text:
         return fallback
-    match = re.search(r"\*+(\d{4})", raw_text)
+    match = MASKED_LAST4_PATTERN.search(raw_text)
     return match.group(1) if match else fallback
 
 
@@ -92,6 +115,18 @@ def normalize_amount_positive(value) -> Decimal:
     return abs(Decimal(value))
 
 
+def get_operator_map(db):
+    """Return the cached operator mapping snapshot, reloading it once it is older than the TTL."""
+    global _operator_map, _operator_map_loaded_at
+    from parsers.operator_mapper import OperatorMapper
+
+    now = time.monotonic()
+    if _operator_map is None or now - _operator_map_loaded_at > OPERATOR_MAP_TTL_SECONDS:
+        _operator_map = OperatorMapper.load_shared_cache(db)
+        _operator_map_loaded_at = now
+    return _operator_map
+
+
 def compute_fingerprint(amount: Decimal, transaction_date: datetime, card_last4: str) -> str:
     """Compute SHA256 fingerprint for duplicate detection."""
     # Normalize: use absolute amount, date to minute precision, last 4 of card
@@ -183,7 +218,8 @@ def queue_receipt_task(task_data: dict, force: bool = False) -> str:
                     raise ValueError(f"Сообщение уже обработано (транзакция #{existing_txn.id})")
 
         # Dispatch new Celery task
-        result = process_receipt_task.delay(json.dumps(task_data))
+        # Passed as a dict: the orjson task serializer encodes the message body once
+        result = process_receipt_task.delay(task_data)
 
         if chat_id is None or msg_id is None:
             return result.id
@@ -206,12 +242,12 @@ def queue_receipt_task(task_data: dict, force: bool = False) -> str:
 
 
 @app.task(name='process_receipt', bind=True, max_retries=3)
-def process_receipt_task(self, task_data_json: str):
+def process_receipt_task(self, task_data: dict):
     """
     Process a single receipt from the queue
     
     Args:
-        task_data_json: JSON string containing receipt data
+        task_data: receipt data (a JSON string in messages queued by older releases)
     """
     from database.connection import get_db
     from database.models import Transaction, ParsingLog, ReceiptProcessingTask, OperatorReference
@@ -219,8 +255,8 @@ def process_receipt_task(self, task_data_json: str):
     
     try:
         celery_task_id = self.request.id
-        # Parse task data
-        task_data = json.loads(task_data_json)
+        if isinstance(task_data, (str, bytes)):
+            task_data = orjson.loads(task_data)
         raw_text_original = task_data.get('raw_text') or ""
         source_type = task_data.get('source_type', 'MANUAL')
         source_chat_id = str(task_data.get('source_chat_id')) if task_data.get('source_chat_id') is not None else None
@@ -267,7 +303,6 @@ def process_receipt_task(self, task_data_json: str):
                         if tracking:
                             tracking.status = 'done'
                             tracking.transaction_id = existing.id
-                            db.commit()
                         log = ParsingLog(
                             raw_message=raw_text_original,
                             parsing_method=None,
@@ -275,6 +310,7 @@ def process_receipt_task(self, task_data_json: str):
                             processing_time_ms=processing_time
                         )
                         db.add(log)
+                        # Tracking update + log go out in one commit
                         db.commit()
                         return {
                             'success': True,
@@ -283,7 +319,7 @@ def process_receipt_task(self, task_data_json: str):
                             'id': existing.id
                         }
 
-            orchestrator = ParserOrchestrator(db)
+            orchestrator = ParserOrchestrator(db, operator_mappings=get_operator_map(db))
             gpt_parser = orchestrator.gpt_parser
             raw_text = raw_text_original or ""
             parsed_data = None
@@ -312,9 +348,9 @@ def process_receipt_task(self, task_data_json: str):
             if is_pdf and (not parsed_data or len(raw_text.strip()) < 40):
                 if gpt_parser and getattr(gpt_parser, "enabled", False) and pdf_bytes:
                     try:
-                        from parsers.pdf_extractor import render_pdf_bytes_to_png_base64
+                        from parsers.pdf_extractor import render_pdf_bytes_to_base64
 
-                        images_b64 = render_pdf_bytes_to_png_base64(pdf_bytes, max_pages=2, dpi=170)
+                        images_b64 = render_pdf_bytes_to_base64(pdf_bytes, max_pages=2, dpi=170)
                         caption_text = (document.get("caption") or raw_text_original or "").strip()
                         parsed_data = gpt_parser.parse_from_images(images_b64, caption_text)
                         if parsed_data:
@@ -418,7 +454,7 @@ def process_receipt_task(self, task_data_json: str):
             
             # Check if fingerprint already exists (duplicate content)
             existing_by_fp = (
-                db.query(Transaction)
+                db.query(Transaction.id, Transaction.uuid)
                 .filter(Transaction.fingerprint == fp)
                 .first()
             )
@@ -427,7 +463,6 @@ def process_receipt_task(self, task_data_json: str):
                 if tracking:
                     tracking.status = 'done'
                     tracking.transaction_id = existing_by_fp.id
-                    db.commit()
                 log = ParsingLog(
                     raw_message=raw_text,
                     parsing_method=method_value,
@@ -467,13 +502,16 @@ def process_receipt_task(self, task_data_json: str):
             )
 
             db.add(transaction)
-            db.commit()
+            # Flush for the generated id; transaction, tracking and log then
+            # commit together instead of three separate round trips
+            db.flush()
+            transaction_id = transaction.id
+            transaction_uuid = transaction.uuid
 
             if tracking:
                 tracking.status = 'done'
-                tracking.transaction_id = transaction.id
+                tracking.transaction_id = transaction_id
                 tracking.error = None
-                db.commit()
 
             log = ParsingLog(
                 raw_message=raw_text,
@@ -484,12 +522,12 @@ def process_receipt_task(self, task_data_json: str):
             db.add(log)
             db.commit()
 
-            print(f"✅ Transaction saved: {transaction.id} ({transaction.amount} {transaction.currency})")
+            print(f"✅ Transaction saved: {transaction_id} ({amount} {currency})")
 
             return {
                 'success': True,
-                'transaction_id': str(transaction.uuid),
-                'id': transaction.id,
+                'transaction_id': str(transaction_uuid),
+                'id': transaction_id,
                 'amount': str(amount),
                 'currency': currency,
                 'application': app_name